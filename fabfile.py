@@ -52,6 +52,13 @@ def test(coverage=False):
     manage(command, prefix=coverage, nocd=coverage)
 
 
+@task
+def benchmark(options=''):
+    """Run benchmarks of processors, options passed to command"""
+
+    manage('benchmark {}'.format(options))
+
+
 @task
 def run():
     """Run server"""
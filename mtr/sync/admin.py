@@ -3,6 +3,7 @@ import os
 from functools import partial
 
 from django.utils.translation import gettext_lazy as _
+from django.utils.html import escape
 from django.contrib import admin
 from django import forms
 
@@ -15,17 +16,24 @@ class ErrorInline(admin.TabularInline):
     model = Error
     extra = 0
     readonly_fields = (
-        'position', 'message', 'step', 'input_position', 'input_value')
+        'position', 'message', 'step', 'count', 'input_position',
+        'last_input_position', 'input_value', 'samples')
 
 
 class ReportAdmin(admin.ModelAdmin):
     inlines = (ErrorInline,)
     list_display = (
-        'action', 'status', 'started_at', 'completed_at', 'buffer_file_link')
+        'action', 'status', 'started_at', 'completed_at', 'progress',
+        'rows_processed', 'errors_count', 'rate', 'buffer_file_link')
     list_filter = ('action', 'status', 'started_at', 'completed_at')
     search_fields = ('buffer_file',)
-    readonly_fields = ('completed_at',)
+    readonly_fields = (
+        'completed_at', 'checkpoint', 'rows_processed', 'rows_total',
+        'errors_count', 'rate', 'cancel_requested', 'timings_table',
+        'queries_count', 'queries_seconds', 'queries_table',
+        'profile_links')
     date_hierarchy = 'started_at'
+    actions = ['cancel']
 
     def buffer_file_link(self, obj):
         """Display download link"""
@@ -37,6 +45,60 @@ class ReportAdmin(admin.ModelAdmin):
     buffer_file_link.short_description = _(
         'mtr.sync:Link to file')
 
+    def timings_table(self, obj):
+        """Display time spent at each step"""
+
+        rows = ''.join(
+            '<tr><td>{}</td><td>{:.3f}</td><td>{}</td></tr>'.format(
+                escape(label), seconds, count)
+            for label, seconds, count in obj.stage_timings())
+
+        return '<table><tr><th>{}</th><th>{}</th><th>{}</th></tr>{}' \
+            '</table>'.format(
+                _('mtr.sync:step'), _('mtr.sync:seconds'),
+                _('mtr.sync:count'), rows)
+
+    timings_table.allow_tags = True
+    timings_table.short_description = _('mtr.sync:stages timings')
+
+    def queries_table(self, obj):
+        """Display most time consuming queries"""
+
+        rows = ''.join(
+            '<tr><td>{}</td><td>{:.3f}</td><td>{}</td></tr>'.format(
+                escape(query['sql']), query['seconds'], query['count'])
+            for query in obj.top_queries())
+
+        return '<table><tr><th>{}</th><th>{}</th><th>{}</th></tr>{}' \
+            '</table>'.format(
+                _('mtr.sync:query'), _('mtr.sync:seconds'),
+                _('mtr.sync:count'), rows)
+
+    queries_table.allow_tags = True
+    queries_table.short_description = _('mtr.sync:top queries')
+
+    def profile_links(self, obj):
+        """Display download links of profiles"""
+
+        return ' '.join(
+            '<a href="{}">{}</a>'.format(
+                item.url, os.path.basename(item.name))
+            for item in (obj.profile_file, obj.memory_file) if item)
+
+    profile_links.allow_tags = True
+    profile_links.short_description = _('mtr.sync:Profiles')
+
+    def cancel(self, request, queryset):
+        """Request cancel of selected running reports"""
+
+        for report in queryset.filter(status=Report.RUNNING):
+            report.cancel()
+
+        self.message_user(
+            request, _('mtr.sync:Cancel requested for running reports.'))
+
+    cancel.short_description = _('mtr.sync:Cancel')
+
 
 class FieldForm(forms.ModelForm):
 
@@ -150,15 +212,34 @@ class SettingsAdmin(admin.ModelAdmin):
                 ('name', 'action', 'processor'),
                 ('start_col', 'end_col'), ('start_row', 'end_row'),
                 ('main_model', 'dataset', 'data_action'),
+                ('key_fields', 'skip_unchanged'),
                 ('filename', 'worksheet', 'include_header'),
+                ('encoding', 'delimiter', 'quotechar'),
             )
         }),
+        (_('mtr.sync:Schedule'), {
+            'fields': (
+                ('period', 'cron', 'next_run_at'),
+                ('queue', 'priority', 'max_concurrency'),
+            )
+        }),
+        (_('mtr.sync:Profiling'), {
+            'fields': (('profile_cpu', 'profile_memory'),)
+        }),
         (_('mtr.sync:Options'), {
             'fields': (('create_fields', 'populate'),)
         })
     )
+    readonly_fields = ('next_run_at',)
     form = SettingsForm
 
+    def save_related(self, request, form, formsets, change):
+        """Save fields of inlines with one version change"""
+
+        with form.instance.changing_fields():
+            super(SettingsAdmin, self).save_related(
+                request, form, formsets, change)
+
     def get_inline_instances(self, request, obj=None):
         """Show inlines only in saved models"""
 
@@ -173,11 +254,14 @@ class SettingsAdmin(admin.ModelAdmin):
         """Run action with selected settings"""
 
         for settings in queryset:
-            settings.run()
-
-            self.message_user(
-                request,
-                _('mtr.sync:Data synchronization started in background.'))
+            if settings.run():
+                self.message_user(
+                    request,
+                    _('mtr.sync:Data synchronization started in background.'))
+            else:
+                self.message_user(
+                    request,
+                    _('mtr.sync:Data synchronization already queued.'))
 
     run.short_description = _('mtr.sync:Sync data')
 
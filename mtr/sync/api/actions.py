@@ -1,12 +1,14 @@
-import traceback
+import sys
 
 from django.utils.translation import gettext_lazy as _
+from django.core.exceptions import ValidationError
 from django.db import transaction, Error, models
 
 from .manager import manager
 from .exceptions import ErrorChoicesMixin
 from .signals import error_raised
-from .helpers import model_fields
+from .helpers import model_fields, chunks
+from ..settings import CHUNK_SIZE
 
 
 def _create_related_instance(instance, related_model, key, related_models):
@@ -61,7 +63,7 @@ def _create_instances(model, main_model_attrs, related_models):
 
 
 @manager.register('action',
-    label=_('mtr.sync:Create instances without filter'))
+    label=_('mtr.sync:Create instances without filter'), writes=True)
 def create(row, model, model_attrs, related_attrs, processor):
     sid = transaction.savepoint()
 
@@ -69,13 +71,9 @@ def create(row, model, model_attrs, related_attrs, processor):
         with transaction.atomic():
             _create_instances(model, model_attrs, related_attrs)
     except (Error, ValueError,
-            AttributeError, TypeError, IndexError):
+            AttributeError, TypeError, IndexError) as e:
 
         transaction.savepoint_rollback(sid)
-        error_message = traceback.format_exc()
-        if 'File' in error_message:
-            error_message = 'File{}'.format(
-                error_message.split('File')[-1])
 
         value = {
             'model_attrs': model_attrs,
@@ -83,7 +81,294 @@ def create(row, model, model_attrs, related_attrs, processor):
         }
 
         error_raised.send(processor,
-            error=error_message,
+            exception=e,
+            traceback=sys.exc_info()[2],
             position=row,
             value=value,
             step=ErrorChoicesMixin.IMPORT_DATA)
+
+
+# validated fields of models: fields by name, required and unique names
+_validation_fields = {}
+
+
+def validation_fields(model):
+    """Return fields used for validation without saving, compiled once
+    for model: plain fields by name, required and unique fields names"""
+
+    compiled = _validation_fields.get(model, None)
+    if compiled is not None:
+        return compiled
+
+    fields, required, unique = {}, [], []
+
+    for field in model._meta.fields:
+        if field.rel is not None:
+            continue
+
+        fields[field.name] = field
+
+        if not (field.blank or field.null or field.has_default() or
+                isinstance(field, models.AutoField)):
+            required.append(field.name)
+        if field.unique:
+            unique.append(field.name)
+
+    compiled = _validation_fields[model] = (fields, required, unique)
+
+    return compiled
+
+
+def _validation_error(processor, row, error, value, field):
+    error_raised.send(processor,
+        exception=error,
+        position=row,
+        value=value,
+        field=field,
+        step=ErrorChoicesMixin.IMPORT_DATA)
+
+
+def validate_unique(items, model, processor):
+    """Check unique fields of chunk items for duplicates in file
+    and database with one query per field"""
+
+    fields, required, unique = validation_fields(model)
+    seen = getattr(processor, 'unique_values', None)
+    if seen is None:
+        seen = processor.unique_values = {}
+
+    for name in unique:
+        field = fields[name]
+        values = {}
+
+        for row, model_attrs, related_attrs in items:
+            value = model_attrs.get(name, None)
+            if value in (None, ''):
+                continue
+
+            try:
+                value = field.to_python(value)
+            except ValidationError:
+                continue
+
+            values.setdefault(value, []).append(row)
+
+        existing = set(model._default_manager.filter(**{
+            '{}__in'.format(name): list(values.keys())
+        }).values_list(name, flat=True)) if values else set()
+
+        field_seen = seen.setdefault(name, set())
+
+        for value, rows in values.items():
+            duplicated = value in existing or value in field_seen
+            for row in rows[0 if duplicated else 1:]:
+                _validation_error(
+                    processor, row, ValidationError(
+                        field.error_messages['unique'] % {
+                            'model_name': model._meta.verbose_name,
+                            'field_label': field.verbose_name}),
+                    value, name)
+
+            field_seen.add(value)
+
+
+@manager.register('action',
+    label=_('mtr.sync:Validate without saving'),
+    chunk_action=validate_unique)
+def validate(row, model, model_attrs, related_attrs, processor):
+    """Clean values by model fields and check required fields missing
+    in row, unique fields checked for whole chunk"""
+
+    fields, required, unique = validation_fields(model)
+
+    for name, value in model_attrs.items():
+        field = fields.get(name, None)
+        if field is None:
+            continue
+
+        try:
+            field.clean(value, None)
+        except ValidationError as e:
+            _validation_error(processor, row, e, value, name)
+
+    # blank values of present fields reported by clean
+    for name in required:
+        if name not in model_attrs:
+            _validation_error(processor, row, ValidationError(
+                fields[name].error_messages['required'],
+                code='required'), None, name)
+
+
+def _sync_error(processor, row, error, value):
+    error_raised.send(processor,
+        exception=error,
+        traceback=sys.exc_info()[2],
+        position=row,
+        value=value,
+        step=ErrorChoicesMixin.IMPORT_DATA)
+
+
+def _sync_insert(model, items, processor):
+    """Insert items with one query, one by one if bulk insert failed
+    to report failed rows"""
+
+    try:
+        with transaction.atomic():
+            model._default_manager.bulk_create(
+                [model(**attrs) for row, attrs in items])
+        return len(items)
+    except Error:
+        pass
+
+    inserted = 0
+    for row, attrs in items:
+        try:
+            with transaction.atomic():
+                model._default_manager.create(**attrs)
+            inserted += 1
+        except (Error, ValueError, TypeError) as e:
+            _sync_error(processor, row, e, attrs)
+
+    return inserted
+
+
+def _sync_key(fields, names, model_attrs):
+    return tuple(
+        fields[name].to_python(model_attrs[name]) for name in names)
+
+
+def _sync_update(model, changed, targets, processor):
+    """Update rows with same changed values with one query, one by one
+    if it failed to report failed rows"""
+
+    try:
+        with transaction.atomic():
+            model._default_manager.filter(
+                pk__in=[pk for pk, row, attrs in targets]).update(**changed)
+        return len(targets)
+    except Error:
+        pass
+
+    updated = 0
+    for pk, row, attrs in targets:
+        try:
+            with transaction.atomic():
+                model._default_manager.filter(pk=pk).update(**changed)
+            updated += 1
+        except Error as e:
+            _sync_error(processor, row, e, attrs)
+
+    return updated
+
+
+def sync_chunk(items, model, processor):
+    """Insert new and update changed rows of chunk found by key fields,
+    keys of file collected to delete missing rows when import completed.
+    Only plain fields of model are synchronized"""
+
+    fields, required, unique = validation_fields(model)
+    names = processor.settings.key_fields_list()
+
+    # rows can not be matched without keys, nothing synchronized
+    if not names:
+        error = ValidationError(
+            _('mtr.sync:key fields required to synchronize rows'),
+            code='key_fields')
+        for row, model_attrs, related_attrs in items:
+            _sync_error(processor, row, error, model_attrs)
+        return
+
+    seen = getattr(processor, 'sync_keys', None)
+    if seen is None:
+        seen = processor.sync_keys = set()
+
+    rows = {}
+    for row, model_attrs, related_attrs in items:
+        try:
+            key = _sync_key(fields, names, model_attrs)
+        except (ValidationError, KeyError) as e:
+            _sync_error(processor, row, e, model_attrs)
+            continue
+
+        # row with invalid values is still in file and not deleted
+        seen.add(key)
+
+        try:
+            attrs = dict(
+                (name, fields[name].to_python(value))
+                for name, value in model_attrs.items() if name in fields)
+        except ValidationError as e:
+            _sync_error(processor, row, e, model_attrs)
+            continue
+
+        rows[key] = (row, attrs)
+
+    # rows skipped by hashes are kept
+    for row, model_attrs, related_attrs in processor.unchanged:
+        try:
+            seen.add(_sync_key(fields, names, model_attrs))
+        except (ValidationError, KeyError):
+            pass
+
+    # changed rows grouped by same values to update them at once
+    updates = {}
+    existing = model._default_manager.filter(**{
+        '{}__in'.format(names[0]): set(key[0] for key in rows.keys())})
+
+    for instance in existing:
+        item = rows.pop(
+            tuple(getattr(instance, name) for name in names), None)
+        if item is None:
+            continue
+
+        row, attrs = item
+        changed = tuple(sorted(
+            (name, value) for name, value in attrs.items()
+            if getattr(instance, name) != value))
+
+        if changed:
+            updates.setdefault(changed, []).append((instance.pk, row, attrs))
+
+    updated = 0
+    for changed, targets in updates.items():
+        updated += _sync_update(model, dict(changed), targets, processor)
+
+    inserted = _sync_insert(model, list(rows.values()), processor)
+
+    if processor.metrics:
+        processor.metrics.emit('inserted', inserted)
+        processor.metrics.emit('updated', updated)
+
+
+def sync_complete(model, processor):
+    """Delete rows of settings dataset which keys are missing in file,
+    skipped if not all rows of file imported: for resumed, limited
+    and empty imports or imports with errors"""
+
+    seen = getattr(processor, 'sync_keys', None)
+    names = processor.settings.key_fields_list()
+    if processor.resumed or processor.limited or \
+            processor.errors_count or not seen or not names:
+        return
+
+    queryset = processor.manager.prepare_export_queryset(processor.settings)
+
+    missing = [
+        values[0] for values in
+        queryset.values_list('pk', *names).iterator()
+        if tuple(values[1:]) not in seen]
+
+    for pks in chunks(missing, CHUNK_SIZE()):
+        model._default_manager.filter(pk__in=pks).delete()
+
+    if processor.metrics:
+        processor.metrics.emit('deleted', len(missing))
+
+
+@manager.register('action',
+    label=_('mtr.sync:Synchronize by key fields'),
+    chunk_action=sync_chunk, complete_action=sync_complete, writes=True)
+def sync(row, model, model_attrs, related_attrs, processor):
+    """Rows are synchronized by chunks"""
+
+    pass
@@ -4,7 +4,7 @@ from django.utils.six import text_type
 from .manager import manager
 
 
-@manager.register('converter', label=_('mtr.sync:Auto'))
+@manager.register('converter', label=_('mtr.sync:Auto'), flat_only=True)
 def auto(value, model, field, action):
     """Auto convert values to field types in models"""
 
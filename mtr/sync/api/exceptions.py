@@ -30,9 +30,17 @@ class ErrorChoicesMixin(object):
     )
 
 
+class ProcessCancelled(Exception):
+    pass
+
+
 class ItemDoesNotRegistered(Exception):
     pass
 
 
 class ItemAlreadyRegistered(Exception):
     pass
+
+
+class SlotsBusy(Exception):
+    pass
@@ -1,15 +1,122 @@
+import json
+import hashlib
+import zipfile
+import importlib
+
 from collections import OrderedDict
+from itertools import islice
 
-from django.utils.six.moves import filterfalse
 from django.db import models
+from django.db.models.signals import class_prepared
+from django.test.signals import setting_changed
 from django.utils.translation import gettext_lazy as _
+from django.utils.six import text_type
 from django.db.models.fields import Field as ModelField
 
-from ..settings import MODEL_SETTINGS_NAME
+from ..settings import PREFIX, MODEL_SETTINGS_NAME, MODEL_ATTRIBUTES_DEPTH
 
 _chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
 
+class LazyModule(object):
+
+    """Module proxy which imports module with listed submodules
+    on first attribute access"""
+
+    def __init__(self, name, *submodules):
+        self.__dict__['_names'] = (name,) + submodules
+        self.__dict__['_module'] = None
+
+    def load(self):
+        module = self.__dict__['_module']
+
+        if module is None:
+            for name in self._names:
+                imported = importlib.import_module(name)
+                module = module or imported
+            self.__dict__['_module'] = module
+
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+
+# all created module proxies for preloading
+_lazy_modules = []
+
+
+def lazy_import(name, *submodules):
+    """Return module proxy, heavy libraries imported on first use"""
+
+    module = LazyModule(name, *submodules)
+    _lazy_modules.append(module)
+
+    return module
+
+
+def preload_modules():
+    """Import all modules of lazy proxies"""
+
+    for module in _lazy_modules:
+        module.load()
+
+
+def chunks(iterable, size):
+    """Return iterator of lists with size items from iterable"""
+
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(
+        value, sort_keys=True, default=text_type
+    ).encode('utf-8')).hexdigest()
+
+
+def row_key(model_attrs, names):
+    """Return digest of key attributes values of converted row"""
+
+    return _digest([model_attrs.get(name, None) for name in names])
+
+
+def row_hash(model_attrs, related_attrs):
+    """Return digest of all attributes values of converted row"""
+
+    return _digest([model_attrs, related_attrs])
+
+
+def unique_names(names):
+    """Return names with duplicates suffixed by occurrence number"""
+
+    seen = set(names)
+    counts = {}
+    result = []
+
+    for name in names:
+        if name in counts:
+            counts[name] += 1
+            suffixed = '{}_{}'.format(name, counts[name])
+            while suffixed in seen:
+                counts[name] += 1
+                suffixed = '{}_{}'.format(name, counts[name])
+            seen.add(suffixed)
+            name = suffixed
+        else:
+            counts[name] = 1
+
+        result.append(name)
+
+    return result
+
+
 def column_name(index):
     """Return column name for given index"""
     name = ''
@@ -47,23 +154,109 @@ def column_value(value):
     return column_index(value)
 
 
+def zip_names(head, path):
+    """Return names of files in zip archive or empty list
+    if file signature is not zip"""
+
+    if not head.startswith(b'PK\x03\x04'):
+        return []
+
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return archive.namelist()
+    except zipfile.BadZipfile:
+        return []
+
+
+# models by dotted path and cached introspection results by model
+_models_registry = OrderedDict()
+_models_settings = {}
+_models_fields = {}
+_models_attributes = {}
+
+
+def clear_models_cache(**kwargs):
+    """Clear models registry and cached introspection results"""
+
+    _models_registry.clear()
+    _models_settings.clear()
+    _models_fields.clear()
+    _models_attributes.clear()
+
+
+def _models_ready():
+    """Return True when all models loaded"""
+
+    try:
+        from django.apps import apps
+    except ImportError:
+        from django.db.models.loading import app_cache_ready
+
+        return app_cache_ready()
+
+    return apps.ready
+
+
+def _clear_models_cache_prepared(**kwargs):
+    clear_models_cache()
+
+    if _models_ready():
+        class_prepared.disconnect(_clear_models_cache_prepared)
+
+
+def _clear_models_cache_setting(setting, **kwargs):
+    if setting.startswith(PREFIX):
+        clear_models_cache()
+
+
+# models classes created while loading and changed settings
+# invalidates registry
+if not _models_ready():
+    class_prepared.connect(_clear_models_cache_prepared)
+setting_changed.connect(_clear_models_cache_setting)
+
+
 def model_settings(model):
-    return getattr(model, MODEL_SETTINGS_NAME(), {})
+    msettings = _models_settings.get(model, None)
 
+    if msettings is None:
+        msettings = getattr(model, MODEL_SETTINGS_NAME(), {})
+        _models_settings[model] = msettings
 
-def models_list():
-    # TODO: get models deprecation
+    return msettings
+
+
+def models_registry():
+    """Return dict of not ignored models by dotted path, built once"""
+
+    if not _models_registry:
+        # TODO: get models deprecation
 
-    mlist = filterfalse(
-        lambda m: model_settings(m).get('ignore', False),
-        models.get_models())
+        for model in models.get_models():
+            if not model_settings(model).get('ignore', False):
+                _models_registry['{}.{}'.format(
+                    model.__module__, model.__name__)] = model
 
-    return mlist
+    return _models_registry
+
+
+def models_list():
+    return models_registry().values()
 
 
 def model_fields(model):
-    """Return model field or custom method"""
+    """Return model field or custom method, cached by model"""
+
+    fields = _models_fields.get(model, None)
+
+    if fields is None:
+        fields = _model_fields(model)
+        _models_fields[model] = fields
 
+    return fields
+
+
+def _model_fields(model):
     opts = model._meta
     sortable_virtual_fields = [
         f for f in opts.virtual_fields
@@ -88,14 +281,40 @@ def model_fields(model):
     return OrderedDict(ordered_fields)
 
 
-def model_attributes(settings, prefix=None, model=None, parent=None):
-    """Return iterator of fields names by given mode_path"""
+def attribute_field(model, attribute):
+    """Return model field for given attribute path or None"""
 
-    model = model or make_model_class(settings)
+    if model is None:
+        return None
+
+    name, related = attribute, None
+    if '|_' in attribute:
+        name, related = attribute.split('|_', 1)
+        related = related.split('_|', 1)[1]
+
+    field = model_fields(model).get(name, None)
+
+    if related is not None:
+        if field is None or not hasattr(field, 'rel'):
+            return None
+
+        return attribute_field(field.rel.to, related)
+
+    return field if isinstance(field, ModelField) else None
+
+
+def _model_attributes(model, depth):
+    """Return list of attributes for model, related models
+    walked until depth is exhausted, cached by model and depth"""
+
+    key = (model, depth)
+    attrs = _models_attributes.get(key, None)
+    if attrs is not None:
+        return attrs
+
+    attrs = []
 
     for name, field in model_fields(model).items():
-        label = name
-        child_attrs = None
         m_prefix = None
 
         if isinstance(field, models.ForeignKey):
@@ -110,28 +329,38 @@ def model_attributes(settings, prefix=None, model=None, parent=None):
                 field, 'verbose_name', getattr(
                     field, '__name__', repr(field))))
 
-        if m_prefix:
-            child_attrs = model_attributes(
-                    settings, m_prefix.format(name),
-                    model=field.rel.to, parent=model)
-        if prefix:
-            name = ''.join((prefix, name))
-
-        if child_attrs:
-            for name, label in child_attrs:
-                yield (name, '{} | {}'.format(
-                    field.rel.to._meta.verbose_name, label).capitalize())
+        if m_prefix and depth > 0:
+            related_name = field.rel.to._meta.verbose_name
+
+            for child_name, child_label in _model_attributes(
+                    field.rel.to, depth - 1):
+                attrs.append((
+                    ''.join((m_prefix.format(name), child_name)),
+                    '{} | {}'.format(related_name, child_label).capitalize()))
         else:
-            yield (name, label.capitalize())
+            attrs.append((name, label.capitalize()))
+
+    _models_attributes[key] = attrs
+
+    return attrs
+
+
+def model_attributes(settings, prefix=None, model=None, parent=None):
+    """Return list of fields names by given mode_path"""
+
+    model = model or make_model_class(settings)
+    attrs = _model_attributes(model, MODEL_ATTRIBUTES_DEPTH())
+
+    if prefix:
+        return [(''.join((prefix, name)), label) for name, label in attrs]
+
+    return list(attrs)
 
 
 def make_model_class(settings):
     """Return class for name in main_model"""
 
-    for mmodel in models_list():
-        if settings.main_model == '{}.{}'.format(
-                mmodel.__module__, mmodel.__name__):
-            return mmodel
+    return models_registry().get(settings.main_model, None)
 
 
 def model_choices():
@@ -139,9 +368,9 @@ def model_choices():
 
     yield ('', '-' * 9)
 
-    for model in models_list():
+    for name, model in models_registry().items():
         yield (
-            '{}.{}'.format(model.__module__, model.__name__),
+            name,
             '{} | {}'.format(
                 model._meta.app_label.title(),
                 model._meta.verbose_name.title()))
@@ -4,20 +4,27 @@ from collections import OrderedDict
 
 from django.utils.six.moves import filterfalse
 
-from .exceptions import ItemAlreadyRegistered, ItemDoesNotRegistered
+from .exceptions import ItemAlreadyRegistered, ItemDoesNotRegistered, \
+    ErrorChoicesMixin
+from .profiling import RunProfiler, clock
 from .helpers import column_value, make_model_class, model_settings, \
     process_attribute
-from ..settings import IMPORT_PROCESSORS
+from ..settings import IMPORT_PROCESSORS, SNIFF_SIZE, METRICS_BACKENDS
 
 
 class ProcessorManagerMixin(object):
 
-    def convert_value(self, value, model, field, export=False, action=None):
-        """Process value with filters and actions"""
+    def convert_value(
+            self, value, model, field, export=False, action=None, flat=True):
+        """Process value with filters and actions, converters marked
+        as flat_only skipped for processors with nested values"""
 
         convert_action = 'export' if export else 'import'
 
         for convert_func in field.ordered_converters:
+            if not flat and getattr(convert_func, 'flat_only', False):
+                continue
+
             value = convert_func(value, model, field, convert_action)
 
         return value
@@ -44,34 +51,78 @@ class ProcessorManagerMixin(object):
         for name, action in self.actions.items():
             yield(name, getattr(action, 'label', action.__name__))
 
+    def detect_processor(self, path):
+        """Return processor which matches first bytes of file"""
+
+        with open(path, 'rb') as f:
+            head = f.read(SNIFF_SIZE())
+
+        for processor in self.processors.values():
+            if processor.check_signature(head, path):
+                return processor
+
     def make_processor(self, settings, from_extension=False):
-        """Create new processor instance if exists"""
+        """Create new processor instance if exists, with from_extension
+        processor detected by file signature, then by extension"""
 
         processor = None
 
         if from_extension:
-            extension = settings.buffer_file.path.split('.')[-1]
-            for pr in self.processors.values():
-                if pr.file_format.strip('.') == extension:
-                    processor = pr
-                    settings.processor = processor.__name__
-                    break
+            path = settings.buffer_file.path
+            processor = self.detect_processor(path)
+
+            if processor is None:
+                extension = path.split('.')[-1]
+                for pr in self.processors.values():
+                    if pr.file_format.strip('.') == extension:
+                        processor = pr
+                        break
+
+            if processor is not None:
+                settings.processor = processor.__name__
 
         processor = self.get_or_raise('processor', settings.processor)
 
         return processor(settings, self)
 
-    def export_data(self, settings, data=None):
+    def make_metrics(self, processor):
+        """Return metrics of processor run with enabled backends"""
+
+        from .metrics import Metrics
+
+        return Metrics(processor, [
+            self.get_or_raise('metric', name)()
+            for name in METRICS_BACKENDS()])
+
+    def make_profiler(self, settings, profile=None):
+        """Return profiler enabled by settings flags or
+        list of profile kinds: cpu, memory"""
+
+        profile = profile or ()
+
+        return RunProfiler(
+            cpu=settings.profile_cpu or 'cpu' in profile,
+            memory=settings.profile_memory or 'memory' in profile)
+
+    def export_data(self, settings, data=None, profile=None):
         """Export data to file if no data passed,
         create queryset it from settings"""
 
         processor = self.make_processor(settings)
 
-        if data is None:
-            queryset = self.prepare_export_queryset(settings)
-            data = self.prepare_export_data(processor, queryset)
+        with processor.queries, \
+                self.make_profiler(settings, profile) as profiler:
+            if data is None:
+                with processor.timer.stage(
+                        ErrorChoicesMixin.PREPARE_QUERYSET):
+                    queryset = self.prepare_export_queryset(settings)
+                    data = self.prepare_export_data(processor, queryset)
 
-        return processor.export_data(data)
+            report = processor.export_data(data)
+
+        processor.save_profile(profiler)
+
+        return report
 
     def prepare_export_queryset(self, settings):
         current_model = make_model_class(settings)
@@ -118,40 +169,79 @@ class ProcessorManagerMixin(object):
             'rows': queryset.count(),
             'cols': len(fields),
             'fields': fields,
-            'items': (
+            'items': self.export_items(processor, queryset, model, fields)
+        }
+
+    def export_items(self, processor, queryset, model, fields):
+        """Return iterator of converted values of queryset items,
+        fetching and converting timed separately"""
+
+        timer = processor.timer
+        items = iter(queryset)
+
+        while True:
+            start = clock()
+            item = next(items, None)
+            if item is None:
+                return
+
+            converted = clock()
+            values = [
                 self.convert_value(
                     process_attribute(item, field.attribute),
-                    model, field, export=True)
-                for item in queryset
-                for field in fields
-            )
-        }
+                    model, field, export=True, flat=processor.flat)
+                for field in fields]
 
-    def import_data(self, settings, path=None):
-        """Import data to database"""
+            timer.add(ErrorChoicesMixin.PREPARE_QUERYSET, converted - start)
+            timer.add(ErrorChoicesMixin.PREPARE_DATA, clock() - converted)
+
+            for value in values:
+                yield value
+
+    def import_data(self, settings, path=None, resume=None, profile=None):
+        """Import data to database, continue import of resume report
+        from its checkpoint if passed"""
 
         processor = self.make_processor(settings)
         model = make_model_class(settings)
 
-        return processor.import_data(model, path)
+        with processor.queries, \
+                self.make_profiler(settings, profile) as profiler:
+            report = processor.import_data(model, path, resume=resume)
+
+        processor.save_profile(profiler)
+
+        return report
 
     def model_data(self, processor, model, fields):
+        columns = [
+            (column_value(field.name) if field.name else index, field)
+            for index, field in enumerate(fields)]
+
+        timer = processor.timer
+
         for row_index in processor.rows:
             _model = {}
+
+            start = clock()
             row = processor.read(row_index)
+            readed = clock()
 
-            for index, field in enumerate(fields):
-                col = column_value(field.name) if field.name else index
-                value = self.convert_value(row[col], model, field)
+            for col, field in columns:
+                value = self.convert_value(
+                    row[col], model, field, flat=processor.flat)
                 _model[field.attribute] = value
 
+            timer.add(ErrorChoicesMixin.READ_FILE, readed - start)
+            timer.add(ErrorChoicesMixin.PREPARE_DATA, clock() - readed)
+
             yield row_index, _model
 
     def prepare_import_data(self, processor, model):
         """Prepare data using filters from settings and return iterator"""
 
         settings = processor.settings
-        fields = list(settings.fields_with_processors())
+        fields = settings.fields_with_processors()
 
         if settings.end_col:
             cols = column_value(settings.end_col)
@@ -163,6 +253,7 @@ class ProcessorManagerMixin(object):
 
         return {
             'cols': len(fields),
+            'fields': fields,
             'items': self.model_data(processor, model, fields),
         }
 
@@ -174,6 +265,7 @@ class ProcessorManagerMixin(object):
 
         __import__('mtr.sync.api.converters')
         __import__('mtr.sync.api.actions')
+        __import__('mtr.sync.api.metrics')
 
 
 class Manager(ProcessorManagerMixin):
@@ -185,6 +277,7 @@ class Manager(ProcessorManagerMixin):
         self.actions = OrderedDict()
         self.converters = OrderedDict()
         self.datasets = OrderedDict()
+        self.metrics = OrderedDict()
 
     def _make_key(self, key):
         return '{}s'.format(key)
@@ -217,6 +310,9 @@ class Manager(ProcessorManagerMixin):
             if label:
                 func.label = label
 
+            for attr, value in kwargs.items():
+                setattr(func, attr, value)
+
             if values is not None:
                 if values.get(new_name, None) is not None:
                     raise ItemAlreadyRegistered(
@@ -0,0 +1,159 @@
+from __future__ import division
+
+import os
+import json
+import time
+import logging
+
+from django.conf import settings as django_settings
+
+from .manager import manager
+from .exceptions import ErrorChoicesMixin
+from .profiling import clock
+from ..settings import METRICS_FILE
+
+logger = logging.getLogger('mtr.sync.metrics')
+
+STEP_NAMES = {
+    ErrorChoicesMixin.PREPARE_QUERYSET: 'prepare_queryset',
+    ErrorChoicesMixin.PREPARE_DATA: 'prepare_data',
+    ErrorChoicesMixin.SETUP_DIMENSIONS: 'setup_dimensions',
+    ErrorChoicesMixin.OPEN_FILE: 'open_file',
+    ErrorChoicesMixin.CREATE_FILE: 'create_file',
+    ErrorChoicesMixin.WRITE_HEADER: 'write_header',
+    ErrorChoicesMixin.WRITE_DATA: 'write_data',
+    ErrorChoicesMixin.SAVE_FILE: 'save_file',
+    ErrorChoicesMixin.READ_FILE: 'read_file',
+    ErrorChoicesMixin.IMPORT_DATA: 'import_data',
+}
+
+
+class MetricsBackend(object):
+
+    """Base backend receiving metrics of sync runs, subclasses
+    registered as metric at manager and enabled by METRICS_BACKENDS"""
+
+    def emit(self, name, value, tags):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+
+@manager.register('metric')
+class LoggingMetrics(MetricsBackend):
+
+    """Write metrics as log lines of mtr.sync.metrics logger"""
+
+    def emit(self, name, value, tags):
+        logger.info('%s %s %s', name, value, ' '.join(
+            '{}={}'.format(key, tags[key]) for key in sorted(tags)))
+
+
+@manager.register('metric')
+class FileMetrics(MetricsBackend):
+
+    """Append metrics as json lines time series to METRICS_FILE"""
+
+    def __init__(self):
+        self.lines = []
+
+    def emit(self, name, value, tags):
+        self.lines.append(json.dumps({
+            'time': time.time(), 'name': name, 'value': value,
+            'tags': tags}, sort_keys=True))
+
+    def flush(self):
+        if not self.lines:
+            return
+
+        path = METRICS_FILE() or os.path.join(
+            django_settings.MEDIA_ROOT, 'sync', 'metrics.jsonl')
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        with open(path, 'a') as f:
+            f.write('\n'.join(self.lines))
+            f.write('\n')
+
+        self.lines = []
+
+
+class Metrics(object):
+
+    """Metrics of processor run sent to enabled backends, values
+    computed per chunk of rows from processor timer and errors"""
+
+    def __init__(self, processor, backends):
+        self.processor = processor
+        self.backends = backends
+        self.tags = {
+            'processor': processor.__class__.__name__,
+            'settings': getattr(processor.settings, 'id', None),
+        }
+
+    def __bool__(self):
+        return bool(self.backends)
+
+    __nonzero__ = __bool__
+
+    def emit(self, name, value):
+        name = 'mtr.sync.{}.{}'.format(self.action, name)
+
+        for backend in self.backends:
+            backend.emit(name, value, self.tags)
+
+    def start(self, action, rows=0):
+        self.action = action
+        self._started = self._time = clock()
+        self._rows = rows
+        self._errors = 0
+        self._seconds = {}
+
+    def chunk(self, rows):
+        """Emit rows, throughput, stages seconds and errors
+        of rows processed since previous chunk"""
+
+        if not self.backends:
+            return
+
+        now = clock()
+        count = rows - self._rows
+        elapsed = now - self._time
+
+        self.emit('rows', count)
+        if elapsed:
+            self.emit('rows_per_second', count / elapsed)
+
+        for step, seconds in self.processor.timer.seconds.items():
+            delta = seconds - self._seconds.get(step, 0)
+            if delta:
+                self.emit('seconds.{}'.format(STEP_NAMES[step]), delta)
+            self._seconds[step] = seconds
+
+        errors = self.processor.errors_count
+        self.emit('errors', errors - self._errors)
+
+        self._rows, self._time, self._errors = rows, now, errors
+
+    def complete(self, rows=None, path=None, status='success'):
+        """Emit remaining chunk, totals of run and flush backends,
+        bytes of path emitted as written or readed file size"""
+
+        if not self.backends:
+            return
+
+        if rows is None:
+            rows = self._rows
+        elif rows != self._rows:
+            self.chunk(rows)
+
+        self.emit('duration', clock() - self._started)
+        self.emit('rows_total', rows)
+        self.emit(status, 1)
+
+        if path is not None and os.path.exists(path):
+            self.emit('bytes', os.path.getsize(path))
+
+        for backend in self.backends:
+            backend.flush()
@@ -1,16 +1,22 @@
 from __future__ import unicode_literals
 
 import os
-
+import json
 
 from django.utils.six.moves import range
 from django.utils import timezone
+from django.db import transaction
 
 from .signals import export_started, export_completed, \
-    import_started, import_completed
-from .helpers import column_value
+    import_started, import_completed, process_cancelled
+from .exceptions import ProcessCancelled, ErrorChoicesMixin
+from .profiling import StageTimer, QueryRecorder, clock
+from .helpers import column_value, make_model_class, chunks, \
+    row_key, row_hash
 
-from ..settings import LIMIT_PREVIEW, FILE_PATH
+from ..settings import LIMIT_PREVIEW, FILE_PATH, CHUNK_SIZE, \
+    PROGRESS_ROWS, PROGRESS_INTERVAL, CANCEL_INTERVAL, QUERIES_TOP, \
+    strip_media_root
 
 
 class DataProcessor(object):
@@ -26,10 +32,12 @@ class DataProcessor(object):
         if self.settings.end_row and \
                 self.settings.end_row < self.end['row']:
             self.end['row'] = self.settings.end_row
+            self.limited = True
 
         limit = LIMIT_PREVIEW()
         if preview and limit < self.end['row']:
             self.end['row'] = limit + self.start['row'] - 1
+            self.limited = True
 
         if self.settings.include_header:
             if import_data:
@@ -64,12 +72,34 @@ class DataProcessor(object):
         self.start = {'row': start_row, 'col': start_col}
         self.end = {'row': end_row, 'col': end_col}
 
+        # not all rows of file are processed
+        self.limited = False
+
         self._set_rows_dimensions(preview, import_data)
         self._set_cols_dimensions(import_data, field_cols)
 
         self.cells = range(self.start['col'], self.end['col'])
         self.rows = range(self.start['row'], self.end['row'])
 
+    def data_offset(self):
+        """Return rows and cols offset of data for formats which store
+        only data without empty cells and header row"""
+
+        row, col = 0, 0
+
+        if self.settings.start_row and self.settings.start_row > 0:
+            row = self.settings.start_row - 1
+
+        if self.settings.start_col:
+            start_col_index = column_value(self.settings.start_col)
+            if start_col_index > 0:
+                col = start_col_index - 1
+
+        if self.settings.include_header:
+            row += 1
+
+        return row, col
+
 
 class Processor(DataProcessor):
 
@@ -79,10 +109,28 @@ class Processor(DataProcessor):
     file_format = None
     file_description = None
 
+    # values stored in separate cells, lists should be joined
+    flat = True
+
     def __init__(self, settings, manager):
         self.settings = settings
         self.manager = manager
         self.report = None
+        self.model = None
+        self.fields = []
+        self.errors_count = 0
+        self.errors = {}
+        self.resumed = False
+        self.unchanged = []
+        self.timer = StageTimer()
+        self.queries = QueryRecorder()
+        self.metrics = manager.make_metrics(self)
+
+    @classmethod
+    def check_signature(cls, head, path):
+        """Return True if first bytes of file matches processor format"""
+
+        return False
 
     def write(self, row, cells=None):
         """Independend write to cell method"""
@@ -109,6 +157,11 @@ class Processor(DataProcessor):
 
         raise NotImplementedError
 
+    def close(self):
+        """Close file opened for reading or partially written"""
+
+        pass
+
     def create_export_path(self):
         # TODO: refactor filepath
 
@@ -135,25 +188,53 @@ class Processor(DataProcessor):
         for response in export_started.send(self):
             self.report = response[1]
 
-        self.set_dimensions(0, 0, data['rows'], data['cols'])
-        filename, path = self.create_export_path()
-        self.create(path)
+        self.model = make_model_class(self.settings)
+        self.fields = data['fields']
+        timer = self.timer
+
+        with timer.stage(ErrorChoicesMixin.SETUP_DIMENSIONS):
+            self.set_dimensions(0, 0, data['rows'], data['cols'])
+
+        with timer.stage(ErrorChoicesMixin.CREATE_FILE):
+            filename, path = self.create_export_path()
+            self.create(path)
 
         # write header
-        self.write_header(data)
+        with timer.stage(ErrorChoicesMixin.WRITE_HEADER):
+            self.write_header(data)
 
-        # write data
+        # write data, items timed by manager while iterated
         data = data['items']
+        metrics = self.metrics
+        chunk_size = CHUNK_SIZE()
+        self.start_progress(len(self.rows))
+        metrics.start('export')
+
+        try:
+            for index, row in enumerate(self.rows, 1):
+                row_data = []
 
-        for row in self.rows:
-            row_data = []
+                for col in self.cells:
+                    row_data.append(next(data))
 
-            for col in self.cells:
-                row_data.append(next(data))
+                start = clock()
+                self.write(row, row_data)
+                timer.add(ErrorChoicesMixin.WRITE_DATA, clock() - start)
 
-            self.write(row, row_data)
+                self.update_progress(index, every=64)
+                self.check_cancelled()
 
-        self.save()
+                if metrics and not index % chunk_size:
+                    metrics.chunk(index)
+        except ProcessCancelled:
+            return self.cancel(path)
+
+        with timer.stage(ErrorChoicesMixin.SAVE_FILE):
+            self.save()
+
+        self.update_progress(len(self.rows), force=True, save=False)
+        self.collect_stats()
+        metrics.complete(len(self.rows), path)
 
         # send signal to save report
         for response in export_completed.send(
@@ -207,27 +288,292 @@ class Processor(DataProcessor):
 
         return action(row, model, model_attrs, related_attrs, self)
 
-    def import_data(self, model, path=None):
-        """Import data to model and return errors if exists"""
+    def start_progress(self, rows_total, rows_processed=0):
+        self.rows_total = rows_total
+        self._progress_start = clock()
+        self._progress_initial = rows_processed
+        self._progress_rows = rows_processed + PROGRESS_ROWS()
+        self._progress_time = self._progress_start + PROGRESS_INTERVAL()
+        self._cancel_time = self._progress_start + CANCEL_INTERVAL()
 
-        path = path or self.settings.buffer_file.path
+    def update_progress(self, rows, force=False, save=True, every=1):
+        """Update report progress with single query, not often than
+        every PROGRESS_ROWS rows or PROGRESS_INTERVAL seconds,
+        per row callers check clock only for every n rows"""
 
-        # send signal to create report
-        for response in import_started.send(self, path=path):
+        if not force and rows < self._progress_rows:
+            if rows % every or clock() < self._progress_time:
+                return
+
+        now = clock()
+        elapsed = now - self._progress_start
+
+        values = {
+            'rows_processed': rows,
+            'rows_total': self.rows_total,
+            'errors_count': self.errors_count,
+            'rate': (rows - self._progress_initial) / elapsed
+            if elapsed else None
+        }
+
+        for key, value in values.items():
+            setattr(self.report, key, value)
+
+        if save:
+            self.report.__class__.objects.filter(pk=self.report.pk) \
+                .update(**values)
+            self.settings.refresh_slot()
+
+        self._progress_rows = rows + PROGRESS_ROWS()
+        self._progress_time = now + PROGRESS_INTERVAL()
+
+    def collect_stats(self):
+        """Set stages timings and queries stats to report before save"""
+
+        self.report.timings = self.timer.dumps()
+        self.report.queries_count = self.queries.count
+        self.report.queries_seconds = self.queries.seconds
+        self.report.queries = json.dumps(self.queries.top(QUERIES_TOP()))
+
+    def save_profile(self, profiler):
+        """Save profiler results next to report files"""
+
+        if not profiler.enabled or self.report is None:
+            return
+
+        path = FILE_PATH()(
+            self.report, 'profile-{}'.format(self.report.id), absolute=True)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        values = dict(
+            (name, strip_media_root(filename))
+            for name, filename in profiler.save(path).items())
+
+        for key, value in values.items():
+            setattr(self.report, key, value)
+
+        self.report.__class__.objects.filter(pk=self.report.pk) \
+            .update(**values)
+
+    def check_cancelled(self):
+        """Raise ProcessCancelled if cancel requested for report,
+        database polled not often than every CANCEL_INTERVAL seconds"""
+
+        if clock() < self._cancel_time:
+            return
+
+        if self.report.__class__.objects.filter(
+                pk=self.report.pk, cancel_requested=True).exists():
+            raise ProcessCancelled
+
+        self._cancel_time = clock() + CANCEL_INTERVAL()
+
+    def cancel(self, path=None):
+        """Remove partial file and mark report as cancelled"""
+
+        if path is not None:
+            self.close()
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.collect_stats()
+        self.metrics.complete(status='cancelled')
+
+        for response in process_cancelled.send(self, date=timezone.now()):
             self.report = response[1]
 
-        data = self.manager.prepare_import_data(self, model)
+        return self.report
+
+    def flush_errors(self):
+        """Save counts and samples of aggregated errors changed
+        after previous flush"""
+
+        for error in self.errors.values():
+            if error.count != getattr(error, 'flushed_count', 1):
+                error.samples = json.dumps(error.samples_list)
+                error.save()
+                error.flushed_count = error.count
+
+    def save_checkpoint(self, row):
+        """Save last committed row at report"""
 
-        max_rows, max_cols = self.open(path)
-        self.set_dimensions(
-            0, 0, max_rows, max_cols,
-            import_data=True, field_cols=data['cols'])
+        self.report.checkpoint = row
+        self.report.__class__.objects.filter(pk=self.report.pk) \
+            .update(checkpoint=row)
 
-        items = data['items']
+    def skip_unchanged(self, items):
+        """Return items which hashes differs from saved at previous
+        imports, saved hashes of chunk loaded with one query"""
 
-        for row, _model in items:
-            model_attrs, related_attrs = self.prepare_attrs(_model)
-            self.process_action(row, model, model_attrs, related_attrs)
+        names = self.settings.key_fields_list()
+        hashes = [
+            (row_key(model_attrs, names),
+                row_hash(model_attrs, related_attrs))
+            for row, model_attrs, related_attrs in items]
+
+        saved = dict(self.settings.row_hashes.filter(
+            key__in=set(key for key, value in hashes))
+            .values_list('key', 'hash'))
+
+        changed, self.unchanged = [], []
+        self._unchanged_keys, self._changed_hashes = [], {}
+
+        for item, (key, value) in zip(items, hashes):
+            if saved.get(key, None) == value:
+                self.unchanged.append(item)
+                self._unchanged_keys.append(key)
+            else:
+                changed.append(item)
+                self._changed_hashes[key] = (value, key in saved)
+
+        return changed
+
+    def save_hashes(self, changed=True):
+        """Mark hashes of unchanged items as seen, replace hashes
+        of changed items in bulk, changed are skipped for failed chunk
+        to process its rows again at next import"""
+
+        row_hashes = self.settings.row_hashes
+
+        if self._unchanged_keys:
+            row_hashes.filter(key__in=self._unchanged_keys) \
+                .update(updated_at=self._hashed_at)
+
+        if changed and self._changed_hashes:
+            row_hashes.filter(key__in=[
+                key for key, (value, exists)
+                in self._changed_hashes.items() if exists]).delete()
+            row_hashes.bulk_create([
+                row_hashes.model(
+                    settings=self.settings, key=key, hash=value,
+                    updated_at=self._hashed_at)
+                for key, (value, exists) in self._changed_hashes.items()])
+
+    def prune_hashes(self):
+        """Delete hashes of keys missing in imported file"""
+
+        self.settings.row_hashes \
+            .filter(updated_at__lt=self._hashed_at).delete()
+
+    def import_data(self, model, path=None, resume=None):
+        """Import data to model and return errors if exists,
+        resume report continues import after its checkpoint"""
+
+        if resume is not None:
+            self.report = resume
+            self.resumed = True
+
+            # cancelled report can be resumed
+            if resume.cancel_requested:
+                resume.cancel_requested = False
+                resume.__class__.objects.filter(pk=resume.pk) \
+                    .update(cancel_requested=False)
+            path = path or resume.buffer_file.path
+
+            # errors of resumed report aggregated with new ones
+            self.errors_count = resume.errors_count
+            for error in resume.errors.exclude(signature=''):
+                error.samples_list = json.loads(error.samples or '[]')
+                error.flushed_count = error.count
+                self.errors[error.signature] = error
+        else:
+            path = path or self.settings.buffer_file.path
+
+            # send signal to create report
+            for response in import_started.send(self, path=path):
+                self.report = response[1]
+
+        timer = self.timer
+
+        with timer.stage(ErrorChoicesMixin.PREPARE_DATA):
+            data = self.manager.prepare_import_data(self, model)
+        self.model = model
+        self.fields = data['fields']
+
+        with timer.stage(ErrorChoicesMixin.OPEN_FILE):
+            max_rows, max_cols = self.open(path)
+
+        with timer.stage(ErrorChoicesMixin.SETUP_DIMENSIONS):
+            self.set_dimensions(
+                0, 0, max_rows, max_cols,
+                import_data=True, field_cols=data['cols'])
+
+        # processed rows counted by checkpoint, progress saved rarely
+        rows = 0
+        if resume is not None and resume.checkpoint is not None:
+            rows = max(resume.checkpoint + 1 - self.start['row'], 0)
+            self.rows = range(self.start['row'] + rows, self.end['row'])
+
+        self.start_progress(rows + len(self.rows), rows)
+        self.metrics.start('import', rows)
+
+        # action can process prepared attrs of whole chunk
+        # and complete import after all chunks
+        action = self.manager.get_or_raise(
+            'action', self.settings.data_action or 'create')
+        chunk_action = getattr(action, 'chunk_action', None)
+        complete_action = getattr(action, 'complete_action', None)
+
+        # unchanged rows found by hashes of previous imports,
+        # hashes saved only by actions which write rows
+        hashed = self.settings.skip_unchanged and \
+            getattr(action, 'writes', False) and \
+            bool(self.settings.key_fields_list())
+        self._hashed_at = timezone.now()
+
+        # each chunk committed with checkpoint of last row,
+        # cancellation rollbacks current chunk, items read and
+        # converted by manager while chunk created
+        try:
+            for chunk in chunks(data['items'], CHUNK_SIZE()):
+                start = clock()
+                errors_count = self.errors_count
+                items = [
+                    (row, ) + self.prepare_attrs(_model)
+                    for row, _model in chunk]
+
+                with transaction.atomic():
+                    if hashed:
+                        items = self.skip_unchanged(items)
+
+                    for row, model_attrs, related_attrs in items:
+                        self.process_action(
+                            row, model, model_attrs, related_attrs)
+                        self.check_cancelled()
+
+                    if chunk_action is not None:
+                        chunk_action(items, model, self)
+                    if hashed:
+                        self.save_hashes(errors_count == self.errors_count)
+
+                    self.save_checkpoint(chunk[-1][0])
+
+                timer.add(
+                    ErrorChoicesMixin.IMPORT_DATA, clock() - start,
+                    len(chunk))
+
+                rows += len(chunk)
+                self.update_progress(rows)
+                self.metrics.chunk(rows)
+
+            if complete_action is not None:
+                with transaction.atomic():
+                    complete_action(model, self)
+            # hashes of rows not read or failed are kept
+            if hashed and not self.resumed and not self.limited \
+                    and not self.errors_count:
+                self.prune_hashes()
+        except ProcessCancelled:
+            return self.cancel()
+        finally:
+            # counts of aggregated errors kept if import failed
+            self.flush_errors()
+            self.close()
+
+        self.update_progress(rows, force=True, save=False)
+        self.collect_stats()
+        self.metrics.complete(rows, path)
 
         # send signal to save report
         for response in import_completed.send(
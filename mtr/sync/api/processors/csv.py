@@ -1,5 +1,13 @@
 from __future__ import absolute_import
 
+import io
+import re
+import codecs
+
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+
 from django.utils.translation import gettext_lazy as _
 from django.utils import six
 
@@ -10,6 +18,139 @@ else:
 
 from ..processor import Processor
 from ..manager import manager
+from ..helpers import attribute_field, column_value
+from ...settings import CSV_SAMPLE_ROWS, SNIFF_SIZE
+
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%m/%d/%Y')
+DATETIME_FORMATS = (
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M',
+    '%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M')
+
+BOOLEAN_VALUES = {
+    'true': True, 'yes': True, 'on': True, '1': True,
+    'false': False, 'no': False, 'off': False, '0': False
+}
+
+FIELD_KINDS = {
+    'AutoField': 'int',
+    'IntegerField': 'int',
+    'BigIntegerField': 'int',
+    'SmallIntegerField': 'int',
+    'PositiveIntegerField': 'int',
+    'PositiveSmallIntegerField': 'int',
+    'DecimalField': 'decimal',
+    'FloatField': 'float',
+    'BooleanField': 'bool',
+    'NullBooleanField': 'bool',
+    'DateField': 'date',
+    'DateTimeField': 'datetime'
+}
+
+_int_re = re.compile(r'^[-+]?\d+$')
+_decimal_re = re.compile(r'^[-+]?(\d+\.\d*|\.\d+)$')
+
+
+def _parse_bool(value):
+    return BOOLEAN_VALUES[value.strip().lower()]
+
+
+def _date_parser(date_format):
+    return lambda value: datetime.strptime(value, date_format).date()
+
+
+def _datetime_parser(date_format):
+    return lambda value: datetime.strptime(value, date_format)
+
+
+def _date_format(values, formats):
+    """Return first format that parses all given values"""
+
+    for date_format in formats:
+        try:
+            for value in values:
+                datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+
+        return date_format
+
+
+def _kind_parser(kind, values):
+    """Return parser for column kind if all sample values fits it"""
+
+    if kind == 'int':
+        if all(_int_re.match(value) for value in values):
+            return int
+    elif kind in ('decimal', 'float'):
+        if all(_int_re.match(value) or _decimal_re.match(value)
+                for value in values):
+            return Decimal if kind == 'decimal' else float
+    elif kind == 'bool':
+        if all(value.strip().lower() in BOOLEAN_VALUES for value in values):
+            return _parse_bool
+    elif kind == 'date':
+        date_format = _date_format(values, DATE_FORMATS)
+        if date_format:
+            return _date_parser(date_format)
+    elif kind == 'datetime':
+        date_format = _date_format(values, DATETIME_FORMATS)
+        if date_format:
+            return _datetime_parser(date_format)
+
+
+def column_parser(values, field=None):
+    """Return parser for column sample values, consistent with model
+    field type when it is known, None means leave values as text"""
+
+    values = [value for value in values if value]
+    if not values:
+        return None
+
+    if field is not None:
+        kind = FIELD_KINDS.get(field.get_internal_type(), None)
+
+        return _kind_parser(kind, values) if kind else None
+
+    for kind in ('int', 'decimal', 'date', 'datetime'):
+        parser = _kind_parser(kind, values)
+        if parser is not None:
+            return parser
+
+    if all(not value.isdigit() for value in values):
+        return _kind_parser('bool', values)
+
+
+def sniff_encoding(sample):
+    """Return encoding of sample bytes using byte order marks
+    or first encoding which decodes sample"""
+
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    elif sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+
+    for encoding in ('utf-8', 'cp1252'):
+        try:
+            sample.decode(encoding)
+        except UnicodeDecodeError as error:
+            # sample can be cut in the middle of multibyte char
+            if encoding != 'utf-8' or error.start < len(sample) - 3:
+                continue
+
+        return encoding
+
+    return 'latin-1'
+
+
+def sniff_dialect(sample):
+    """Return delimiter and quote char for decoded sample"""
+
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+    except csv.Error:
+        return ',', '"'
+
+    return dialect.delimiter, dialect.quotechar
 
 
 @manager.register('processor')
@@ -17,12 +158,58 @@ class CsvProcessor(Processor):
     file_format = '.csv'
     file_description = _('mtr.sync:CSV')
 
-    def create(self, path):
-        # TODO: csv additional settings
+    # values detected from file sample, settings are not changed
+    encoding = None
+    delimiter = None
+    quotechar = None
+
+    @classmethod
+    def check_signature(cls, head, path):
+        head = head.lstrip()
+
+        return bool(head) and b'\x00' not in head and \
+            not head.startswith(b'{')
+
+    def sniff(self, path):
+        """Detect encoding and dialect not set at settings from file
+        sample, detected values used only for current file"""
+
+        with open(path, 'rb') as f:
+            sample = f.read(SNIFF_SIZE())
+
+        self.encoding = self.settings.encoding or sniff_encoding(sample)
+
+        if self.settings.delimiter:
+            self.delimiter = self.settings.delimiter
+            self.quotechar = self.settings.quotechar
+        else:
+            sample = sample.decode(self.encoding, 'ignore')
+            self.delimiter, quotechar = sniff_dialect(
+                sample.rsplit('\n', 1)[0])
+            self.quotechar = self.settings.quotechar or quotechar
+
+    def _open(self, path, mode):
+        encoding = self.encoding or self.settings.encoding or 'utf-8'
+        kwargs = {
+            'dialect': 'excel',
+            'delimiter': str(
+                self.delimiter or self.settings.delimiter or ','),
+            'quotechar': str(
+                self.quotechar or self.settings.quotechar or '"')
+        }
+
+        if six.PY2:
+            kwargs['encoding'] = encoding
+            f = open(path, '{}b'.format(mode))
+        else:
+            f = io.open(path, mode, encoding=encoding, newline='')
+
+        return f, kwargs
 
+    def create(self, path):
         self._prepend = None
-        self._f = open(path, 'w')
-        self._writer = csv.writer(self._f, dialect='excel')
+        self._f, kwargs = self._open(path, 'w')
+        self._writer = csv.writer(self._f, **kwargs)
 
         # prepend rows and cols
         if self.start['row'] > 1:
@@ -34,8 +221,11 @@ class CsvProcessor(Processor):
             self._prepend *= self.start['col']
 
     def open(self, path):
-        self._f = open(path, 'r')
-        self._reader = csv.reader(self._f, dialect='excel')
+        self._path = path
+        self._parsers = None
+        self.sniff(path)
+        self._f, kwargs = self._open(path, 'r')
+        self._reader = csv.reader(self._f, **kwargs)
         self._rows_counter = 0
 
         maxrows = 0
@@ -69,23 +259,68 @@ class CsvProcessor(Processor):
 
         return value
 
+    def _column_fields(self):
+        """Return model fields mapped by column index"""
+
+        fields = {}
+
+        for index, field in enumerate(self.fields):
+            col = column_value(field.name) if field.name else index
+            if col < len(self.cells):
+                fields[self.cells[col]] = attribute_field(
+                    self.model, field.attribute)
+
+        return fields
+
+    def _make_parsers(self):
+        """Sample first rows once and choose parser for each column"""
+
+        f, kwargs = self._open(self._path, 'r')
+        with f:
+            sample = list(islice(
+                csv.reader(f, **kwargs), self.start['row'],
+                self.start['row'] + CSV_SAMPLE_ROWS()))
+
+        fields = self._column_fields()
+        parsers = {}
+
+        for index in self.cells:
+            values = [row[index] for row in sample if index < len(row)]
+            parser = column_parser(values, fields.get(index, None))
+            if parser is not None:
+                parsers[index] = parser
+
+        return parsers
+
     def read(self, row, cells=None):
         readed = []
         value = self._get_row(row)
         cells = cells or self.cells
 
-        for index in cells:
-            # TODO: value convert
+        if self._parsers is None:
+            self._parsers = self._make_parsers()
+        parsers = self._parsers
 
+        for index in cells:
             try:
                 item = value[index]
-                if item.isdigit():
-                    item = int(item)
-                readed.append(item)
             except IndexError:
                 readed.append('')
+                continue
+
+            parser = parsers.get(index, None)
+            if parser is not None and item:
+                try:
+                    item = parser(item)
+                except (ValueError, ArithmeticError, KeyError):
+                    pass
+
+            readed.append(item)
 
         return readed
 
+    def close(self):
+        self._f.close()
+
     def save(self):
         self._f.close()
@@ -0,0 +1,186 @@
+from __future__ import absolute_import
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.translation import gettext_lazy as _
+
+from ..processor import Processor
+from ..manager import manager
+
+_encoder = DjangoJSONEncoder(separators=(',', ':'))
+_decoder = json.JSONDecoder()
+
+
+def attribute_path(attribute):
+    """Split attribute to list of (name, relation kind) pairs"""
+
+    path = []
+
+    while '|_' in attribute:
+        name, attribute = attribute.split('|_', 1)
+        kind, attribute = attribute.split('_|', 1)
+        path.append((name, kind))
+
+    path.append((attribute, None))
+
+    return path
+
+
+def nest_value(item, path, value):
+    """Set value into nested object by attribute path,
+    many to many values expected as lists"""
+
+    name, kind = path[0]
+
+    if kind is None:
+        item[name] = value
+    elif kind == 'fk':
+        nest_value(item.setdefault(name, {}), path[1:], value)
+    else:
+        related = item.setdefault(name, [])
+        if not isinstance(value, (list, tuple)):
+            value = [] if value in (None, '') else [value]
+
+        while len(related) < len(value):
+            related.append({})
+
+        for related_item, related_value in zip(related, value):
+            nest_value(related_item, path[1:], related_value)
+
+
+def unnest_value(item, path):
+    """Get value from nested object by attribute path"""
+
+    name, kind = path[0]
+    value = item.get(name, None) if isinstance(item, dict) else None
+
+    if kind is None:
+        return value
+    elif kind == 'fk':
+        return unnest_value(value, path[1:])
+
+    return [unnest_value(related, path[1:]) for related in value or []]
+
+
+def item_attributes(item, prefix=''):
+    """Return attributes of nested object"""
+
+    for name, value in item.items():
+        if isinstance(value, dict):
+            for attribute in item_attributes(
+                    value, '{}{}|_fk_|'.format(prefix, name)):
+                yield attribute
+        elif isinstance(value, list) and value and \
+                isinstance(value[0], dict):
+            for attribute in item_attributes(
+                    value[0], '{}{}|_m_|'.format(prefix, name)):
+                yield attribute
+        else:
+            yield '{}{}'.format(prefix, name)
+
+
+@manager.register('processor')
+class JsonLinesProcessor(Processor):
+
+    """Streams one json object per row, related values nested
+    by attributes, dimensions settings are not stored in file"""
+
+    file_format = '.jsonl'
+    file_description = _('mtr.sync:JSON Lines')
+
+    flat = False
+
+    @classmethod
+    def check_signature(cls, head, path):
+        return head.lstrip().startswith(b'{')
+
+    def create(self, path):
+        self._f = open(path, 'w')
+        self._paths = [
+            attribute_path(field.attribute)
+            for field in self.fields[:len(self.cells)]]
+
+    def write_header(self, data):
+        """Attributes are stored as object keys"""
+
+        pass
+
+    def write(self, row, value):
+        item = {}
+
+        for path, cell in zip(self._paths, value):
+            nest_value(item, path, cell)
+
+        self._f.write(_encoder.encode(item))
+        self._f.write('\n')
+
+    def open(self, path):
+        self._f = open(path, 'r')
+        self._rows_counter = 0
+        self._row = []
+        self._attributes = [field.attribute for field in self.fields]
+
+        # blank lines are not rows
+        maxrows = 0
+        for line in self._f:
+            if not line.strip():
+                continue
+            if not self._attributes:
+                self._attributes = list(
+                    item_attributes(_decoder.decode(line)))
+            maxrows += 1
+
+        self._f.seek(0)
+        self._paths = list(map(attribute_path, self._attributes))
+        self._row_offset, self._col_offset = self.data_offset()
+
+        return (
+            maxrows + self._row_offset,
+            len(self._paths) + self._col_offset)
+
+    def _get_row(self, index):
+        if index < 0:
+            if index == -1 and self.settings.include_header:
+                return self._attributes
+            return []
+
+        index += 1
+        if index == self._rows_counter:
+            return self._row
+
+        value = ''
+
+        try:
+            while self._rows_counter < index:
+                value = next(self._f).strip()
+                if value:
+                    self._rows_counter += 1
+        except StopIteration:
+            return []
+
+        item = _decoder.decode(value) if value else {}
+        self._row = [unnest_value(item, path) for path in self._paths]
+
+        return self._row
+
+    def read(self, row, cells=None):
+        readed = []
+        value = self._get_row(row - self._row_offset)
+        cells = cells or self.cells
+
+        for index in cells:
+            index -= self._col_offset
+
+            if 0 <= index < len(value):
+                readed.append(value[index])
+            else:
+                readed.append('')
+
+        return readed
+
+    def close(self):
+        self._f.close()
+
+    def save(self):
+        self._f.close()
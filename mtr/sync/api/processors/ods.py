@@ -2,10 +2,11 @@ import os
 
 from django.utils.translation import gettext_lazy as _
 
-import ezodf
-
 from ..processor import Processor
 from ..manager import manager
+from ..helpers import lazy_import, zip_names
+
+ezodf = lazy_import('ezodf')
 
 
 @manager.register('processor')
@@ -13,6 +14,11 @@ class OdsProcessor(Processor):
     file_format = '.ods'
     file_description = _('mtr.sync:ODF Spreadsheet')
 
+    @classmethod
+    def check_signature(cls, head, path):
+        return 'mimetype' in zip_names(head, path) and \
+            b'opendocument.spreadsheet' in head
+
     def create(self, path):
         self._path = path
         self._prepend = None
@@ -0,0 +1,210 @@
+from __future__ import absolute_import
+
+from bisect import bisect_right
+
+from django.conf import settings as django_settings
+from django.utils.translation import gettext_lazy as _
+from django.utils.six import text_type
+
+from ..processor import Processor
+from ..manager import manager
+from ..signals import error_raised
+from ..exceptions import ErrorChoicesMixin
+from ..helpers import attribute_field, lazy_import, unique_names
+from ...settings import PARQUET_ROW_GROUP_SIZE
+
+pyarrow = lazy_import('pyarrow', 'pyarrow.parquet')
+
+INTEGER_FIELDS = (
+    'AutoField', 'IntegerField', 'BigIntegerField', 'SmallIntegerField',
+    'PositiveIntegerField', 'PositiveSmallIntegerField')
+
+
+def column_type(field):
+    """Return arrow type for model field or None if it unknown"""
+
+    if field is None:
+        return None
+
+    internal_type = field.get_internal_type()
+
+    if internal_type in INTEGER_FIELDS:
+        return pyarrow.int64()
+    elif internal_type == 'FloatField':
+        return pyarrow.float64()
+    elif internal_type == 'DecimalField':
+        return pyarrow.decimal128(field.max_digits, field.decimal_places)
+    elif internal_type in ('BooleanField', 'NullBooleanField'):
+        return pyarrow.bool_()
+    elif internal_type == 'DateField':
+        return pyarrow.date32()
+    elif internal_type == 'DateTimeField':
+        return pyarrow.timestamp(
+            'us', tz='UTC' if django_settings.USE_TZ else None)
+
+    return pyarrow.string()
+
+
+@manager.register('processor')
+class ParquetProcessor(Processor):
+
+    """Columnar processor, rows are buffered by columns and written
+    as row groups, dimensions settings are not stored in file"""
+
+    file_format = '.parquet'
+    file_description = _('mtr.sync:Apache Parquet')
+
+    @classmethod
+    def check_signature(cls, head, path):
+        return head.startswith(b'PAR1')
+
+    def create(self, path):
+        self._path = path
+        self._file = None
+        self._writer = None
+        self._buffered = 0
+
+        fields = self.fields[:len(self.cells)]
+        self._names = unique_names([
+            (field.name or field.attribute)
+            if self.settings.include_header else field.attribute
+            for field in fields])
+        self._types = [
+            column_type(attribute_field(self.model, field.attribute)) or
+            pyarrow.string() for field in fields]
+        self._columns = [[] for field in fields]
+        self._rows = []
+
+        # schema fixed by model fields for all row groups
+        self._schema = pyarrow.schema([
+            pyarrow.field(name, column)
+            for name, column in zip(self._names, self._types)])
+
+    def write_header(self, data):
+        """Header is stored in parquet schema"""
+
+        pass
+
+    def write(self, row, value):
+        for column, item in zip(self._columns, value):
+            column.append(item)
+        self._rows.append(row)
+
+        self._buffered += 1
+        if self._buffered >= PARQUET_ROW_GROUP_SIZE():
+            self._write_row_group()
+
+    def _column_array(self, index, values):
+        column = self._types[index]
+
+        if column == pyarrow.string():
+            return pyarrow.array(
+                [None if value is None else text_type(value)
+                    for value in values], type=column)
+
+        try:
+            return pyarrow.array(values, type=column)
+        except (ValueError, TypeError, OverflowError,
+                pyarrow.ArrowException):
+            pass
+
+        # values not matched column type reported and stored as nulls
+        checked = []
+        for row, value in zip(self._rows, values):
+            try:
+                pyarrow.array([value], type=column)
+            except (ValueError, TypeError, OverflowError,
+                    pyarrow.ArrowException) as e:
+                error_raised.send(self,
+                    exception=e,
+                    position=row,
+                    value=value,
+                    field=self._names[index],
+                    step=ErrorChoicesMixin.WRITE_DATA)
+                value = None
+
+            checked.append(value)
+
+        return pyarrow.array(checked, type=column)
+
+    def _write_row_group(self):
+        arrays = [
+            self._column_array(index, values)
+            for index, values in enumerate(self._columns)]
+
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(
+                self._path, self._schema)
+
+        self._writer.write_table(
+            pyarrow.Table.from_arrays(arrays, schema=self._schema))
+
+        self._columns = [[] for column in self._columns]
+        self._rows = []
+        self._buffered = 0
+
+    def open(self, path):
+        self._writer = None
+        self._file = pyarrow.parquet.ParquetFile(path)
+        self._names = self._file.schema.names
+        self._group = []
+        self._group_index = -1
+        self._offsets = []
+
+        rows = 0
+        metadata = self._file.metadata
+        for index in range(metadata.num_row_groups):
+            self._offsets.append(rows)
+            rows += metadata.row_group(index).num_rows
+
+        self._rows_count = rows
+        self._row_offset, self._col_offset = self.data_offset()
+
+        return (
+            rows + self._row_offset,
+            metadata.num_columns + self._col_offset)
+
+    def _get_row(self, index):
+        if index < 0:
+            if index == -1 and self.settings.include_header:
+                return self._names
+            return []
+
+        if index >= self._rows_count:
+            return []
+
+        group_index = bisect_right(self._offsets, index) - 1
+        if group_index != self._group_index:
+            table = self._file.read_row_group(group_index)
+            self._group = list(zip(
+                *[column.to_pylist() for column in table.columns]))
+            self._group_index = group_index
+
+        return self._group[index - self._offsets[group_index]]
+
+    def read(self, row, cells=None):
+        readed = []
+        value = self._get_row(row - self._row_offset)
+        cells = cells or self.cells
+
+        for index in cells:
+            index -= self._col_offset
+
+            if 0 <= index < len(value):
+                readed.append(value[index])
+            else:
+                readed.append('')
+
+        return readed
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None and hasattr(self._file, 'close'):
+            self._file.close()
+
+    def save(self):
+        if self._buffered or self._writer is None:
+            self._write_row_group()
+
+        self._writer.close()
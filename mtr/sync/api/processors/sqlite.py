@@ -0,0 +1,192 @@
+from __future__ import absolute_import
+
+import os
+import sqlite3
+import datetime
+
+from django.utils.translation import gettext_lazy as _
+from django.utils import six
+from django.utils.six import text_type
+
+from ..processor import Processor
+from ..manager import manager
+from ..helpers import attribute_field, unique_names
+from ...settings import SQLITE_BATCH_SIZE
+
+NATIVE_TYPES = six.integer_types + (float, six.text_type, bytes)
+
+INTEGER_FIELDS = (
+    'AutoField', 'IntegerField', 'BigIntegerField', 'SmallIntegerField',
+    'PositiveIntegerField', 'PositiveSmallIntegerField',
+    'BooleanField', 'NullBooleanField')
+
+
+def column_type(field):
+    """Return sqlite column affinity for model field"""
+
+    if field is None:
+        return ''
+
+    internal_type = field.get_internal_type()
+
+    if internal_type in INTEGER_FIELDS:
+        return 'INTEGER'
+    elif internal_type == 'FloatField':
+        return 'REAL'
+    elif internal_type == 'DecimalField':
+        return 'NUMERIC'
+
+    return 'TEXT'
+
+
+def adapt_value(value):
+    """Convert value to type supported by sqlite"""
+
+    if value is None or isinstance(value, NATIVE_TYPES):
+        return value
+    elif isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+
+    return text_type(value)
+
+
+def quote_name(name):
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+@manager.register('processor')
+class SqliteProcessor(Processor):
+
+    """Writes data to table of standalone sqlite database, rows are
+    inserted in batches within one transaction and indexes for key
+    columns created after load"""
+
+    file_format = '.sqlite3'
+    file_description = _('mtr.sync:SQLite database')
+
+    @classmethod
+    def check_signature(cls, head, path):
+        return head.startswith(b'SQLite format 3\x00')
+
+    def _table_name(self):
+        return quote_name(self.settings.worksheet or 'data')
+
+    def create(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+
+        self._connection = sqlite3.connect(path, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode = OFF')
+        self._connection.execute('PRAGMA synchronous = OFF')
+        self._batch = []
+        self._indexes = []
+
+        fields = self.fields[:len(self.cells)]
+        names = unique_names([
+            (field.name or field.attribute)
+            if self.settings.include_header else field.attribute
+            for field in fields])
+
+        columns = []
+        for field, name in zip(fields, names):
+            model_field = attribute_field(self.model, field.attribute)
+
+            columns.append('{} {}'.format(
+                quote_name(name), column_type(model_field)).strip())
+
+            if model_field is not None and (
+                    model_field.primary_key or model_field.unique or
+                    model_field.db_index):
+                self._indexes.append(name)
+
+        self._connection.execute('CREATE TABLE {} ({})'.format(
+            self._table_name(), ', '.join(columns)))
+        self._connection.execute('BEGIN')
+
+        self._insert = 'INSERT INTO {} VALUES ({})'.format(
+            self._table_name(), ', '.join(['?'] * len(columns)))
+
+    def write_header(self, data):
+        """Header is stored as table column names"""
+
+        pass
+
+    def _write_batch(self):
+        self._connection.executemany(self._insert, self._batch)
+        self._batch = []
+
+    def write(self, row, value):
+        self._batch.append(tuple(map(adapt_value, value)))
+
+        if len(self._batch) >= SQLITE_BATCH_SIZE():
+            self._write_batch()
+
+    def open(self, path):
+        self._connection = sqlite3.connect(path)
+        self._chunk = {}
+        self._cursor = None
+        self._cursor_index = None
+
+        cursor = self._connection.execute(
+            'SELECT * FROM {} LIMIT 0'.format(self._table_name()))
+        self._names = [column[0] for column in cursor.description]
+
+        cursor = self._connection.execute(
+            'SELECT COUNT(*) FROM {}'.format(self._table_name()))
+        rows = cursor.fetchone()[0]
+
+        self._row_offset, self._col_offset = self.data_offset()
+
+        return rows + self._row_offset, len(self._names) + self._col_offset
+
+    def _get_row(self, index):
+        if index < 0:
+            if index == -1 and self.settings.include_header:
+                return self._names
+            return []
+
+        row = self._chunk.get(index, None)
+        if row is None:
+            if index != self._cursor_index:
+                # seek cursor only for non sequential reads
+                self._cursor = self._connection.execute(
+                    'SELECT * FROM {} ORDER BY rowid LIMIT -1 OFFSET ?'
+                    .format(self._table_name()), (index,))
+                self._cursor_index = index
+
+            rows = self._cursor.fetchmany(SQLITE_BATCH_SIZE())
+            self._chunk = dict(enumerate(rows, self._cursor_index))
+            self._cursor_index += len(rows)
+            row = self._chunk.get(index, [])
+
+        return row
+
+    def read(self, row, cells=None):
+        readed = []
+        value = self._get_row(row - self._row_offset)
+        cells = cells or self.cells
+
+        for index in cells:
+            index -= self._col_offset
+
+            if 0 <= index < len(value):
+                readed.append(value[index])
+            else:
+                readed.append('')
+
+        return readed
+
+    def close(self):
+        self._connection.close()
+
+    def save(self):
+        if self._batch:
+            self._write_batch()
+
+        for name in self._indexes:
+            self._connection.execute('CREATE INDEX {} ON {} ({})'.format(
+                quote_name('{}_index'.format(name)), self._table_name(),
+                quote_name(name)))
+
+        self._connection.execute('COMMIT')
+        self._connection.close()
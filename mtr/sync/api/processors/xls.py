@@ -1,10 +1,11 @@
-import xlrd
-import xlwt
-
 from django.utils.translation import gettext_lazy as _
 
 from ..processor import Processor
 from ..manager import manager
+from ..helpers import lazy_import
+
+xlrd = lazy_import('xlrd')
+xlwt = lazy_import('xlwt')
 
 
 @manager.register('processor')
@@ -12,6 +13,10 @@ class XlsProcessor(Processor):
     file_format = '.xls'
     file_description = _('mtr.sync:Microsoft Excel 97/2000/XP/2003')
 
+    @classmethod
+    def check_signature(cls, head, path):
+        return head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1')
+
     def create(self, path):
         self._path = path
         self._workbook = xlwt.Workbook('utf-8')
@@ -2,12 +2,13 @@ import os
 
 os.environ['OPENPYXL_LXML'] = 'False'
 
-import openpyxl
-
 from django.utils.translation import gettext_lazy as _
 
 from ..processor import Processor
 from ..manager import manager
+from ..helpers import lazy_import, zip_names
+
+openpyxl = lazy_import('openpyxl')
 
 
 @manager.register('processor')
@@ -15,6 +16,10 @@ class XlsxProcessor(Processor):
     file_format = '.xlsx'
     file_description = _('mtr.sync:Microsoft Excel 2007/2010/2013 XML')
 
+    @classmethod
+    def check_signature(cls, head, path):
+        return 'xl/workbook.xml' in zip_names(head, path)
+
     def create(self, path):
         self._path = path
         self._prepend = None
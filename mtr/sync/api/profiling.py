@@ -0,0 +1,232 @@
+import re
+import json
+import time
+import cProfile
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, DEFAULT_DB_ALIAS
+
+try:
+    from django.db.backends.utils import CursorWrapper
+except ImportError:
+    from django.db.backends.util import CursorWrapper
+
+from ..settings import PROFILE_MEMORY_FRAMES, PROFILE_MEMORY_TOP
+
+# monotonic clock with best available resolution
+clock = getattr(time, 'perf_counter', getattr(time, 'monotonic', time.time))
+
+
+class StageTimer(object):
+
+    """Seconds and number of timed calls spent at processing steps"""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def add(self, step, seconds, count=1):
+        self.seconds[step] += seconds
+        self.counts[step] += count
+
+    @contextmanager
+    def stage(self, step):
+        """Time block of code as step"""
+
+        start = clock()
+        try:
+            yield
+        finally:
+            self.add(step, clock() - start)
+
+    def dumps(self):
+        return json.dumps(dict(
+            (step, {'seconds': seconds, 'count': self.counts[step]})
+            for step, seconds in self.seconds.items()), sort_keys=True)
+
+
+_literals = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_lists = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_spaces = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Replace literals, placeholders and lists of them to group
+    queries which differs only by values"""
+
+    sql = _literals.sub('?', sql.replace('%s', '?'))
+    sql = _lists.sub('(...)', sql)
+
+    return _spaces.sub(' ', sql).strip()
+
+
+class RecordingCursorWrapper(CursorWrapper):
+
+    """Cursor passing executed queries and their time to recorder"""
+
+    def __init__(self, cursor, db, recorder):
+        super(RecordingCursorWrapper, self).__init__(cursor, db)
+        self.recorder = recorder
+
+    def execute(self, sql, params=None):
+        start = clock()
+        try:
+            return super(RecordingCursorWrapper, self).execute(sql, params)
+        finally:
+            self.recorder.add(sql, clock() - start)
+
+    def executemany(self, sql, param_list):
+        start = clock()
+        try:
+            return super(RecordingCursorWrapper, self).executemany(
+                sql, param_list)
+        finally:
+            self.recorder.add(sql, clock() - start)
+
+
+class QueryRecorder(object):
+
+    """Count and time queries of connection grouped by normalized sql,
+    debug cursor of connection replaced by recording one while active,
+    so DEBUG is not required and queries log not grows, default debug
+    cursor kept if queries were already logged"""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = {}
+        self._normalized = {}
+
+    def add(self, sql, seconds):
+        self.count += 1
+        self.seconds += seconds
+
+        key = self._normalized.get(sql, None)
+        if key is None:
+            key = self._normalized[sql] = normalize_sql(sql)
+
+        stats = self.queries.get(key, None)
+        if stats is None:
+            stats = self.queries[key] = [0, 0.0]
+
+        stats[0] += 1
+        stats[1] += seconds
+
+    def _make_cursor(self, cursor):
+        if self._chained is not None:
+            cursor = self._chained(cursor)
+
+        return RecordingCursorWrapper(cursor, self._connection, self)
+
+    def _queries_logged(self, connection):
+        logged = getattr(connection, 'queries_logged', None)
+        if logged is None:
+            logged = self._flag_value or (
+                self._flag_value is None and settings.DEBUG)
+
+        return bool(logged)
+
+    def __enter__(self):
+        connection = self._connection = connections[self.using]
+
+        # recorders can be nested, default debug cursor used only
+        # if queries logged for DEBUG or assertNumQueries
+        self._previous = connection.__dict__.get('make_debug_cursor', None)
+        self._flag = 'force_debug_cursor' \
+            if hasattr(connection, 'force_debug_cursor') \
+            else 'use_debug_cursor'
+        self._flag_value = getattr(connection, self._flag)
+
+        self._chained = self._previous
+        if self._chained is None and self._queries_logged(connection):
+            self._chained = connection.make_debug_cursor
+
+        setattr(connection, self._flag, True)
+        connection.make_debug_cursor = self._make_cursor
+
+        return self
+
+    def __exit__(self, *args):
+        connection = self._connection
+
+        if self._previous is None:
+            del connection.make_debug_cursor
+        else:
+            connection.make_debug_cursor = self._previous
+
+        setattr(connection, self._flag, self._flag_value)
+
+    def top(self, limit):
+        """Return list of normalized sql with count and seconds
+        ordered by spent time"""
+
+        queries = sorted(
+            self.queries.items(), key=lambda query: -query[1][1])
+
+        return [
+            {'sql': sql, 'count': count, 'seconds': seconds}
+            for sql, (count, seconds) in queries[:limit]]
+
+
+class RunProfiler(object):
+
+    """Profile code with cProfile and traced memory allocations,
+    nothing is done for disabled kinds"""
+
+    def __init__(self, cpu=False, memory=False):
+        self.cpu = cpu
+        self.memory = memory and tracemalloc is not None
+        self.profile = None
+        self.snapshot = None
+
+    @property
+    def enabled(self):
+        return self.cpu or self.memory
+
+    def __enter__(self):
+        if self.memory:
+            tracemalloc.start(PROFILE_MEMORY_FRAMES())
+        if self.cpu:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+        return self
+
+    def __exit__(self, *args):
+        if self.cpu:
+            self.profile.disable()
+        if self.memory:
+            self.snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+    def save(self, path):
+        """Save profile to path with .prof extension and top memory
+        allocations to .memory.txt, return dict of saved files"""
+
+        files = {}
+
+        if self.profile is not None:
+            files['profile_file'] = '{}.prof'.format(path)
+            self.profile.dump_stats(files['profile_file'])
+
+        if self.snapshot is not None:
+            files['memory_file'] = '{}.memory.txt'.format(path)
+            statistics = self.snapshot.statistics('traceback')
+
+            with open(files['memory_file'], 'w') as f:
+                for stat in statistics[:PROFILE_MEMORY_TOP()]:
+                    f.write('{}\n'.format(stat))
+                    for line in stat.traceback.format():
+                        f.write('{}\n'.format(line))
+                    f.write('\n')
+
+        return files
@@ -6,4 +6,6 @@ export_completed = Signal(['report', 'completed_at', 'path'])
 import_started = Signal([])
 import_completed = Signal(['report', 'completed_at'])
 
+process_cancelled = Signal(['report', 'completed_at'])
+
 error_raised = Signal(['exception'])
@@ -11,3 +11,8 @@ if django.get_version() >= '1.7':
         name = 'mtr.sync'
         label = 'mtrsync'
         verbose_name = _('mtr.sync:Data sync')
+
+        def ready(self):
+            from .api.helpers import models_registry
+
+            models_registry()
@@ -1,5 +1,6 @@
 import os
 
+from datetime import timedelta
 from functools import wraps
 
 from django.shortcuts import render
@@ -41,6 +42,119 @@ def render_to(template, *args, **kwargs):
     return decorator
 
 
+class LazyChoices(list):
+
+    """Choices for model fields evaluated from function on each access,
+    avoids collecting choices at models import time"""
+
+    def __init__(self, func):
+        super(LazyChoices, self).__init__()
+        self.func = func
+
+    def _choices(self):
+        return list(self.func())
+
+    def __iter__(self):
+        return iter(self._choices())
+
+    def __len__(self):
+        return len(self._choices())
+
+    def __getitem__(self, index):
+        return self._choices()[index]
+
+    def __bool__(self):
+        return True
+
+    __nonzero__ = __bool__
+
+
+# minute, hour, day of month, month and day of week
+CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _cron_values(expression, low, high):
+    values = set()
+
+    for part in expression.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/', 1)
+            step = int(step)
+
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = map(int, part.split('-', 1))
+        else:
+            start = end = int(part)
+            if step > 1:
+                end = high
+
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError('Value out of range: {}'.format(expression))
+
+        values.update(range(start, end + 1, step))
+
+    return values
+
+
+def parse_cron(expression):
+    """Parse cron expression of minute, hour, day of month, month and
+    day of week to sets of allowed values"""
+
+    parts = expression.split()
+    if len(parts) != len(CRON_RANGES):
+        raise ValueError('Cron expression should have 5 fields')
+
+    values = [
+        _cron_values(part, low, high)
+        for part, (low, high) in zip(parts, CRON_RANGES)]
+
+    # sunday is 0 and 7
+    if 7 in values[4]:
+        values[4].add(0)
+
+    return values, parts[2] == '*', parts[4] == '*'
+
+
+def cron_next(expression, after):
+    """Return nearest datetime after given one matched by cron expression,
+    walks by months, days and hours to skip unmatched ranges at once"""
+
+    values, any_day, any_weekday = parse_cron(expression)
+    minutes, hours, days, months, weekdays = values
+
+    date = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = date + timedelta(days=366 * 4)
+
+    while date < limit:
+        if date.month not in months:
+            date = date.replace(day=1, hour=0, minute=0)
+            date = (date + timedelta(days=32)).replace(day=1)
+            continue
+
+        day = date.day in days
+        weekday = (date.weekday() + 1) % 7 in weekdays
+
+        # as in cron, restricted day and weekday matched by any of them
+        if any_day or any_weekday:
+            matched = day and weekday
+        else:
+            matched = day or weekday
+
+        if not matched:
+            date = date.replace(hour=0, minute=0) + timedelta(days=1)
+        elif date.hour not in hours:
+            date = date.replace(minute=0) + timedelta(hours=1)
+        elif date.minute not in minutes:
+            date += timedelta(minutes=1)
+        else:
+            return date
+
+    raise ValueError('Cron expression never matched: {}'.format(expression))
+
+
 def make_from_params(cls, params):
     """Create or fetch Model instance from params"""
 
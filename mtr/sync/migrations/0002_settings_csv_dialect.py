@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settings',
+            name='delimiter',
+            field=models.CharField(verbose_name='delimiter', blank=True, max_length=10),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='settings',
+            name='encoding',
+            field=models.CharField(verbose_name='encoding', blank=True, max_length=255),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='settings',
+            name='quotechar',
+            field=models.CharField(verbose_name='quote character', blank=True, max_length=10),
+            preserve_default=True,
+        ),
+    ]
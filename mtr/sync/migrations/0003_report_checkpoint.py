@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0002_settings_csv_dialect'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='checkpoint',
+            field=models.PositiveIntegerField(null=True, verbose_name='last committed row', blank=True),
+            preserve_default=True,
+        ),
+    ]
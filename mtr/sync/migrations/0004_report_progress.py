@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0003_report_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='errors_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='errors count'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='rate',
+            field=models.FloatField(null=True, verbose_name='rows per second', blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='rows_processed',
+            field=models.PositiveIntegerField(default=0, verbose_name='rows processed'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='rows_total',
+            field=models.PositiveIntegerField(null=True, verbose_name='rows total', blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0004_report_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='cancel_requested',
+            field=models.BooleanField(default=False, verbose_name='cancel requested'),
+            preserve_default=True,
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='status',
+            field=models.PositiveSmallIntegerField(default=1, verbose_name='status', choices=[(0, 'Error'), (1, 'Running'), (2, 'Success'), (3, 'Cancelled')]),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0005_report_cancel_requested'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settings',
+            name='cron',
+            field=models.CharField(help_text='minute, hour, day, month and day of week', max_length=255, verbose_name='run by cron expression', blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='settings',
+            name='next_run_at',
+            field=models.DateTimeField(db_index=True, null=True, verbose_name='next run at', blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='settings',
+            name='period',
+            field=models.PositiveIntegerField(null=True, verbose_name='run every seconds', blank=True),
+            preserve_default=True,
+        ),
+    ]
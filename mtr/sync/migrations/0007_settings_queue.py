@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0006_settings_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settings',
+            name='max_concurrency',
+            field=models.PositiveSmallIntegerField(default=1, help_text='0 for unlimited', verbose_name='max concurrent runs'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='settings',
+            name='priority',
+            field=models.PositiveSmallIntegerField(null=True, verbose_name='priority', blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='settings',
+            name='queue',
+            field=models.CharField(max_length=255, verbose_name='queue', blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0007_settings_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='timings',
+            field=models.TextField(verbose_name='stages timings', blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0008_report_timings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='queries',
+            field=models.TextField(verbose_name='top queries', blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='queries_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='queries count'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='queries_seconds',
+            field=models.FloatField(null=True, verbose_name='queries seconds', blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import mtr.sync.settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0009_report_queries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='memory_file',
+            field=models.FileField(upload_to=mtr.sync.settings.get_buffer_file_path, verbose_name='memory profile', blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='profile_file',
+            field=models.FileField(upload_to=mtr.sync.settings.get_buffer_file_path, verbose_name='cpu profile', blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='settings',
+            name='profile_cpu',
+            field=models.BooleanField(default=False, verbose_name='profile with cProfile'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='settings',
+            name='profile_memory',
+            field=models.BooleanField(default=False, verbose_name='profile memory allocations'),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0010_profiling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='error',
+            name='count',
+            field=models.PositiveIntegerField(default=1, verbose_name='count'),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='error',
+            name='last_input_position',
+            field=models.CharField(max_length=10, verbose_name='last input position', blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='error',
+            name='samples',
+            field=models.TextField(verbose_name='samples', blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='error',
+            name='signature',
+            field=models.CharField(db_index=True, max_length=40, verbose_name='signature', blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0011_error_aggregation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settings',
+            name='key_fields',
+            field=models.CharField(help_text='comma separated model attributes', max_length=255, verbose_name='key fields', blank=True),
+            preserve_default=True,
+        ),
+    ]
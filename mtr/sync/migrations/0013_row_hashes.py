@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mtrsync', '0012_settings_key_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settings',
+            name='skip_unchanged',
+            field=models.BooleanField(default=False, help_text='rows found by key fields with same values as at previous import are not processed', verbose_name='skip unchanged rows'),
+            preserve_default=True,
+        ),
+        migrations.CreateModel(
+            name='RowHash',
+            fields=[
+                ('id', models.AutoField(auto_created=True, verbose_name='ID', primary_key=True, serialize=False)),
+                ('key', models.CharField(verbose_name='key', max_length=40)),
+                ('hash', models.CharField(verbose_name='hash', max_length=40)),
+                ('updated_at', models.DateTimeField(verbose_name='updated at')),
+                ('settings', models.ForeignKey(verbose_name='settings', related_name='row_hashes', to='mtrsync.Settings')),
+            ],
+            options={
+                'verbose_name': 'row hash',
+                'verbose_name_plural': 'row hashes',
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterUniqueTogether(
+            name='rowhash',
+            unique_together=set([('settings', 'key')]),
+        ),
+    ]
@@ -1,16 +1,43 @@
+import re
+import json
+import hashlib
+import traceback
+import threading
+
+from datetime import timedelta
+from contextlib import contextmanager
+
 from django.utils.encoding import python_2_unicode_compatible
+from django.utils.six import text_type
+from django.core.exceptions import ValidationError
+from django.core.cache import cache
 from django.db import models
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from .settings import FILE_PATH, strip_media_root
+from .settings import FILE_PATH, LOCK_TIMEOUT, ERROR_SAMPLES, \
+    strip_media_root
+from .helpers import LazyChoices, cron_next
 from .api import manager
 from .api.helpers import model_attributes, model_choices
 from .api.signals import export_started, export_completed, \
-    import_started, import_completed, error_raised
+    import_started, import_completed, process_cancelled, error_raised
 from .api.exceptions import ErrorChoicesMixin
 
 
+# compiled fields of settings by id, with settings version
+_fields_plans = {}
+
+# settings ids with fields changed in bulk by current thread
+_changing_fields = threading.local()
+
+# values in error messages replaced to group errors by message template
+_error_values = re.compile(r"'[^']*'|\"[^\"]*\"|\b\d+(?:\.\d+)?\b")
+
+
 class PositionMixin(models.Model):
     position = models.PositiveIntegerField(
         _('mtr.sync:position'), null=True, blank=True)
@@ -84,7 +111,7 @@ class Settings(ActionsMixin):
 
     main_model = models.CharField(
         _('mtr.sync:main model'), max_length=255,
-        choices=model_choices(), blank=True)
+        choices=LazyChoices(model_choices), blank=True)
 
     created_at = models.DateTimeField(
         _('mtr.sync:created at'), auto_now_add=True)
@@ -93,13 +120,20 @@ class Settings(ActionsMixin):
 
     processor = models.CharField(
         _('mtr.sync:format'), max_length=255,
-        choices=manager.processor_choices())
+        choices=LazyChoices(manager.processor_choices))
     worksheet = models.CharField(
         _('mtr.sync:worksheet page'), max_length=255, blank=True)
 
     include_header = models.BooleanField(
         _('mtr.sync:include header'), default=True)
 
+    encoding = models.CharField(
+        _('mtr.sync:encoding'), max_length=255, blank=True)
+    delimiter = models.CharField(
+        _('mtr.sync:delimiter'), max_length=10, blank=True)
+    quotechar = models.CharField(
+        _('mtr.sync:quote character'), max_length=10, blank=True)
+
     filename = models.CharField(
         _('mtr.sync:custom filename'), max_length=255, blank=True)
 
@@ -108,16 +142,102 @@ class Settings(ActionsMixin):
 
     dataset = models.CharField(
         _('mtr.sync:dataset'), max_length=255, blank=True,
-        choices=manager.dataset_choices())
+        choices=LazyChoices(manager.dataset_choices))
 
     data_action = models.CharField(
         _('mtr.sync:data action'), blank=True,
-        max_length=255, choices=manager.action_choices())
+        max_length=255, choices=LazyChoices(manager.action_choices))
+    key_fields = models.CharField(
+        _('mtr.sync:key fields'), max_length=255, blank=True,
+        help_text=_('mtr.sync:comma separated model attributes'))
+    skip_unchanged = models.BooleanField(
+        _('mtr.sync:skip unchanged rows'), default=False,
+        help_text=_('mtr.sync:rows found by key fields with same values '
+                    'as at previous import are not processed'))
+
+    period = models.PositiveIntegerField(
+        _('mtr.sync:run every seconds'), null=True, blank=True)
+    cron = models.CharField(
+        _('mtr.sync:run by cron expression'), max_length=255, blank=True,
+        help_text=_('mtr.sync:minute, hour, day, month and day of week'))
+    next_run_at = models.DateTimeField(
+        _('mtr.sync:next run at'), null=True, blank=True, db_index=True)
+
+    queue = models.CharField(
+        _('mtr.sync:queue'), max_length=255, blank=True)
+    priority = models.PositiveSmallIntegerField(
+        _('mtr.sync:priority'), null=True, blank=True)
+    max_concurrency = models.PositiveSmallIntegerField(
+        _('mtr.sync:max concurrent runs'), default=1,
+        help_text=_('mtr.sync:0 for unlimited'))
+
+    profile_cpu = models.BooleanField(
+        _('mtr.sync:profile with cProfile'), default=False)
+    profile_memory = models.BooleanField(
+        _('mtr.sync:profile memory allocations'), default=False)
+
+    fields_version = models.PositiveIntegerField(default=0, editable=False)
+
+    def clean(self):
+        if self.cron:
+            try:
+                cron_next(self.cron, timezone.now())
+            except ValueError as e:
+                raise ValidationError({'cron': [str(e)]})
+
+        if self.skip_unchanged and not self.key_fields_list():
+            raise ValidationError({'key_fields': [
+                _('mtr.sync:key fields required to skip unchanged rows')]})
+
+        if self.data_action == 'sync' and not self.key_fields_list():
+            raise ValidationError({'key_fields': [
+                _('mtr.sync:key fields required to synchronize rows')]})
+
+    def key_fields_list(self):
+        return [name.strip() for name in self.key_fields.split(',')
+                if name.strip()]
+
+    def __init__(self, *args, **kwargs):
+        super(Settings, self).__init__(*args, **kwargs)
+
+        self._schedule = (self.period, self.cron)
+
+    def schedule_next(self, after):
+        """Return next run time after given, None if not scheduled,
+        cron expression matched in local time"""
+
+        if self.cron:
+            if not timezone.is_aware(after):
+                return cron_next(self.cron, after)
+
+            current = timezone.get_current_timezone()
+            after = timezone.localtime(after, current).replace(tzinfo=None)
+
+            return timezone.make_aware(cron_next(self.cron, after), current)
+        elif self.period:
+            return after + timedelta(seconds=self.period)
 
-    def fields_with_processors(self):
-        """Return iterator of fields with filters"""
+    def save(self, *args, **kwargs):
+        schedule = (self.period, self.cron)
+
+        # next run time kept unless schedule changed
+        if self.next_run_at is None or schedule != self._schedule:
+            self.next_run_at = self.schedule_next(timezone.now())
+
+        # fields version changed only by fields, stale value not written
+        if not self._state.adding and not kwargs.get('force_insert') \
+                and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'fields_version']
+
+        super(Settings, self).save(*args, **kwargs)
+
+        self._schedule = schedule
+
+    def _compile_fields(self):
+        fields = list(self.fields.exclude(skip=True))
 
-        fields = self.fields.exclude(skip=True)
         for field in fields:
             field.ordered_converters = []
             if field.converters:
@@ -125,7 +245,46 @@ class Settings(ActionsMixin):
                     field.ordered_converters.append(
                         manager.get_or_raise('converter', converter))
 
-            yield field
+        return fields
+
+    def fields_with_processors(self):
+        """Return list of fields with converters, compiled once for
+        settings version and cached in process"""
+
+        if not self.id:
+            return self._compile_fields()
+
+        version, fields = _fields_plans.get(self.id, (None, None))
+        if fields is None or version != self.fields_version:
+            fields = self._compile_fields()
+            _fields_plans[self.id] = (self.fields_version, fields)
+
+        return fields
+
+    def change_fields_version(self):
+        _fields_plans.pop(self.id, None)
+
+        Settings.objects.filter(pk=self.id) \
+            .update(fields_version=F('fields_version') + 1)
+
+    @contextmanager
+    def changing_fields(self):
+        """Change fields version once for all fields saved in block"""
+
+        changing = getattr(_changing_fields, 'ids', None)
+        if changing is None:
+            changing = _changing_fields.ids = set()
+
+        if self.id in changing:
+            yield
+            return
+
+        changing.add(self.id)
+        try:
+            yield
+        finally:
+            changing.discard(self.id)
+            self.change_fields_version()
 
     def populate_from_buffer_file(self):
         # TODO: move set dimensions in processor open, create methods
@@ -165,24 +324,69 @@ class Settings(ActionsMixin):
         if not self.main_model:
             return []
 
-        for name, label in model_attributes(self):
-            label = label if self.action != self.IMPORT and add_label else ''
-            if name not in exclude:
-                field = self.fields.create(
-                    attribute=name, name=label, converters='auto')
-                fields.append(field)
+        with self.changing_fields():
+            for name, label in model_attributes(self):
+                label = label \
+                    if self.action != self.IMPORT and add_label else ''
+                if name not in exclude:
+                    field = self.fields.create(
+                        attribute=name, name=label, converters='auto')
+                    fields.append(field)
 
         return fields
 
+    def cache_key(self, *parts):
+        return ':'.join(map(str, ('mtr.sync', 'settings', self.id) + parts))
+
+    def acquire_slot(self):
+        """Return cache key of acquired run slot or None if all
+        max_concurrency slots are busy"""
+
+        for slot in range(self.max_concurrency):
+            key = self.cache_key('slot', slot)
+            if cache.add(key, True, LOCK_TIMEOUT()):
+                self.slot = key
+                return key
+
+    def refresh_slot(self):
+        """Extend timeout of acquired slot for long runs"""
+
+        slot = getattr(self, 'slot', None)
+        if slot is not None:
+            cache.set(slot, True, LOCK_TIMEOUT())
+
+    def release_slot(self):
+        slot = getattr(self, 'slot', None)
+        if slot is not None:
+            cache.delete(slot)
+            self.slot = None
+
     def run(self):
-        """Run import or export task from celery"""
+        """Run import or export task from celery at settings queue,
+        return False if run already queued"""
 
         from .tasks import export_data, import_data
 
-        if self.action == self.EXPORT:
-            export_data.apply_async(args=[{'id': self.id}])
-        elif self.action == self.IMPORT:
-            import_data.apply_async(args=[{'id': self.id}])
+        queued = self.cache_key('queued')
+        if not cache.add(queued, True, LOCK_TIMEOUT()):
+            return False
+
+        options = {}
+        if self.queue:
+            options['queue'] = self.queue
+        if self.priority is not None:
+            options['priority'] = self.priority
+
+        try:
+            if self.action == self.EXPORT:
+                export_data.apply_async(args=[{'id': self.id}], **options)
+            elif self.action == self.IMPORT:
+                import_data.apply_async(args=[{'id': self.id}], **options)
+        except Exception:
+            cache.delete(queued)
+            raise
+
+        return True
 
     class Meta:
         verbose_name = _('mtr.sync:settings')
@@ -226,6 +430,44 @@ class Field(PositionMixin):
         return self.name or self.attribute
 
 
+class RowHash(models.Model):
+
+    """Hash of imported row values by digest of its key fields,
+    used to skip unchanged rows at next imports"""
+
+    settings = models.ForeignKey(
+        Settings, verbose_name=_('mtr.sync:settings'),
+        related_name='row_hashes')
+
+    key = models.CharField(_('mtr.sync:key'), max_length=40)
+    hash = models.CharField(_('mtr.sync:hash'), max_length=40)
+    updated_at = models.DateTimeField(_('mtr.sync:updated at'))
+
+    class Meta:
+        verbose_name = _('mtr.sync:row hash')
+        verbose_name_plural = _('mtr.sync:row hashes')
+
+        unique_together = ('settings', 'key')
+
+
+@receiver(post_save, sender=Settings)
+@receiver(post_delete, sender=Settings)
+def invalidate_settings_fields(sender, instance, **kwargs):
+    _fields_plans.pop(instance.id, None)
+
+
+@receiver(post_save, sender=Field)
+@receiver(post_delete, sender=Field)
+def invalidate_fields(sender, instance, **kwargs):
+    """Change fields version to recompile fields in all processes,
+    once at end of bulk changes"""
+
+    _fields_plans.pop(instance.settings_id, None)
+
+    if instance.settings_id not in getattr(_changing_fields, 'ids', ()):
+        Settings(pk=instance.settings_id).change_fields_version()
+
+
 @python_2_unicode_compatible
 class Report(ActionsMixin):
 
@@ -235,11 +477,13 @@ class Report(ActionsMixin):
     ERROR = 0
     RUNNING = 1
     SUCCESS = 2
+    CANCELLED = 3
 
     STATUS_CHOICES = (
         (ERROR, _('mtr.sync:Error')),
         (RUNNING, _('mtr.sync:Running')),
-        (SUCCESS, _('mtr.sync:Success'))
+        (SUCCESS, _('mtr.sync:Success')),
+        (CANCELLED, _('mtr.sync:Cancelled'))
     )
 
     buffer_file = models.FileField(
@@ -259,6 +503,34 @@ class Report(ActionsMixin):
         related_name='reports', null=True, blank=True
     )
 
+    checkpoint = models.PositiveIntegerField(
+        _('mtr.sync:last committed row'), null=True, blank=True)
+
+    rows_processed = models.PositiveIntegerField(
+        _('mtr.sync:rows processed'), default=0)
+    rows_total = models.PositiveIntegerField(
+        _('mtr.sync:rows total'), null=True, blank=True)
+    errors_count = models.PositiveIntegerField(
+        _('mtr.sync:errors count'), default=0)
+    rate = models.FloatField(
+        _('mtr.sync:rows per second'), null=True, blank=True)
+
+    cancel_requested = models.BooleanField(
+        _('mtr.sync:cancel requested'), default=False)
+
+    timings = models.TextField(_('mtr.sync:stages timings'), blank=True)
+
+    queries_count = models.PositiveIntegerField(
+        _('mtr.sync:queries count'), default=0)
+    queries_seconds = models.FloatField(
+        _('mtr.sync:queries seconds'), null=True, blank=True)
+    queries = models.TextField(_('mtr.sync:top queries'), blank=True)
+
+    profile_file = models.FileField(
+        _('mtr.sync:cpu profile'), upload_to=FILE_PATH(), blank=True)
+    memory_file = models.FileField(
+        _('mtr.sync:memory profile'), upload_to=FILE_PATH(), blank=True)
+
     objects = models.Manager()
     export_objects = ExportManager()
     import_objects = ImportManager()
@@ -277,6 +549,40 @@ class Report(ActionsMixin):
         if self.buffer_file:
             return self.buffer_file.url
 
+    def progress(self):
+        """Return percent of processed rows if total is known"""
+
+        if self.rows_total:
+            return int(100 * self.rows_processed / self.rows_total)
+
+    progress.short_description = _('mtr.sync:progress')
+
+    def stage_timings(self):
+        """Return list of step label, seconds and timed calls count
+        ordered by spent time"""
+
+        if not self.timings:
+            return []
+
+        steps = dict(ErrorChoicesMixin.STEP_CHOICES)
+        timings = [
+            (steps.get(int(step), step), value['seconds'], value['count'])
+            for step, value in json.loads(self.timings).items()]
+
+        return sorted(timings, key=lambda timing: -timing[1])
+
+    def top_queries(self):
+        """Return list of most time consuming queries"""
+
+        return json.loads(self.queries) if self.queries else []
+
+    def cancel(self):
+        """Request to stop running import or export"""
+
+        self.cancel_requested = True
+        self.__class__.objects.filter(pk=self.pk) \
+            .update(cancel_requested=True)
+
 
 @receiver(export_started)
 def create_export_report(sender, **kwargs):
@@ -294,6 +600,7 @@ def save_export_report(sender, **kwargs):
     report.buffer_file = kwargs['path']
     report.status = report.SUCCESS
     report.save()
+    sender.flush_errors()
 
     return report
 
@@ -315,6 +622,26 @@ def save_import_report(sender, **kwargs):
     report.completed_at = kwargs['date']
     report.status = report.SUCCESS
     report.save()
+    sender.flush_errors()
+
+    return report
+
+
+@receiver(process_cancelled)
+def save_cancelled_report(sender, **kwargs):
+    report = sender.report
+
+    if sender.settings.id:
+        report.settings = sender.settings
+
+    report.completed_at = kwargs['date']
+    report.status = report.CANCELLED
+
+    # partial export file removed, imported file kept to resume
+    if report.action == report.EXPORT:
+        report.buffer_file = ''
+    report.save()
+    sender.flush_errors()
 
     return report
 
@@ -335,6 +662,13 @@ class Error(PositionMixin, ErrorChoicesMixin):
     input_value = models.TextField(
         _('mtr.sync:input value'), max_length=60000, null=True, blank=True)
 
+    signature = models.CharField(
+        _('mtr.sync:signature'), max_length=40, blank=True, db_index=True)
+    count = models.PositiveIntegerField(_('mtr.sync:count'), default=1)
+    last_input_position = models.CharField(
+        _('mtr.sync:last input position'), max_length=10, blank=True)
+    samples = models.TextField(_('mtr.sync:samples'), blank=True)
+
     class Meta:
         verbose_name = _('mtr.sync:error')
         verbose_name_plural = _('mtr.sync:errors')
@@ -349,12 +683,68 @@ class Error(PositionMixin, ErrorChoicesMixin):
         super(Error, self).save(*args, **kwargs)
 
 
+def error_signature(exception, message, step, field=''):
+    """Return hash of exception type, message template, step and field,
+    validation errors identified by codes or messages templates"""
+
+    if isinstance(exception, ValidationError):
+        errors = getattr(exception, 'error_list', None) or [
+            error for errors in exception.error_dict.values()
+            for error in errors]
+        template = ';'.join(
+            error.code or text_type(error.message) for error in errors)
+    else:
+        template = _error_values.sub('?', message)
+
+    key = '{}:{}:{}:{}'.format(
+        type(exception).__name__ if exception is not None else '',
+        step, field, template)
+
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
 @receiver(error_raised)
 def create_error(sender, **kwargs):
+    """Aggregate errors of processor by signature, error saved with
+    traceback at first occurrence, count, last position and samples
+    of next occurrences saved by processor flush_errors"""
+
     position = kwargs.get('position', '')
     value = kwargs.get('value', None)
+    exception = kwargs.get('exception', None)
+    sender.errors_count += 1
+
+    if exception is not None:
+        message = '{}: {}'.format(type(exception).__name__, exception)
+    else:
+        message = kwargs['error']
+
+    signature = error_signature(
+        exception, message, kwargs['step'], kwargs.get('field', ''))
+    error = sender.errors.get(signature, None)
 
-    Error.objects.create(
-        report=sender.report, message=kwargs['error'],
+    if error is not None:
+        error.count += 1
+        error.last_input_position = position
+
+        if len(error.samples_list) < ERROR_SAMPLES():
+            error.samples_list.append([position, repr(value)])
+
+        return error
+
+    if kwargs.get('traceback', None) is not None:
+        message = ''.join(traceback.format_exception(
+            type(exception), exception, kwargs['traceback']))
+
+    error = Error(
+        report=sender.report, message=message,
         step=kwargs['step'], input_position=position,
+        last_input_position=position, signature=signature,
         input_value=repr(value) if value else None)
+    error.samples_list = [[position, error.input_value]]
+    error.samples = json.dumps(error.samples_list)
+    error.save()
+
+    sender.errors[signature] = error
+
+    return error
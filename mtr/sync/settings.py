@@ -39,15 +39,70 @@ IMPORT_PROCESSORS = getattr_with_prefix('PROCESSORS', [
     'mtr.sync.api.processors.xls',
     'mtr.sync.api.processors.xlsx',
     'mtr.sync.api.processors.ods',
-    'mtr.sync.api.processors.csv'
+    'mtr.sync.api.processors.csv',
+    'mtr.sync.api.processors.jsonl',
+    'mtr.sync.api.processors.sqlite'
 ])
 
 # model attribute where settings placed
 MODEL_SETTINGS_NAME = getattr_with_prefix(
     'MODEL_SETTINGS_NAME', 'sync_settings')
 
+# how deep related models walked for model attributes
+MODEL_ATTRIBUTES_DEPTH = getattr_with_prefix('MODEL_ATTRIBUTES_DEPTH', 2)
+
 # limit preview of data on settings page
 LIMIT_PREVIEW = getattr_with_prefix('LIMIT_PREVIEW', 20)
 
+# number of rows sampled to choose value parsers for csv columns
+CSV_SAMPLE_ROWS = getattr_with_prefix('CSV_SAMPLE_ROWS', 100)
+
+# number of rows buffered in columns before writing parquet row group
+PARQUET_ROW_GROUP_SIZE = getattr_with_prefix('PARQUET_ROW_GROUP_SIZE', 65536)
+
+# number of rows inserted and fetched at once for sqlite files
+SQLITE_BATCH_SIZE = getattr_with_prefix('SQLITE_BATCH_SIZE', 10000)
+
+# bytes read from file to detect its format and csv dialect
+SNIFF_SIZE = getattr_with_prefix('SNIFF_SIZE', 8192)
+
+# prepare registries, libraries and connections at celery worker start
+WORKER_WARM_UP = getattr_with_prefix('WORKER_WARM_UP', False)
+
+# rows processed in one transaction and between progress checks
+CHUNK_SIZE = getattr_with_prefix('CHUNK_SIZE', 1000)
+
+# report progress saved not often than every rows count or seconds
+PROGRESS_ROWS = getattr_with_prefix('PROGRESS_ROWS', 10000)
+PROGRESS_INTERVAL = getattr_with_prefix('PROGRESS_INTERVAL', 2)
+
+# number of most time consuming queries stored at report
+QUERIES_TOP = getattr_with_prefix('QUERIES_TOP', 10)
+
+# traceback frames stored and allocations saved for memory profile
+PROFILE_MEMORY_FRAMES = getattr_with_prefix('PROFILE_MEMORY_FRAMES', 10)
+PROFILE_MEMORY_TOP = getattr_with_prefix('PROFILE_MEMORY_TOP', 50)
+
+# names of registered metrics backends fed while processing,
+# file for time series of file backend
+METRICS_BACKENDS = getattr_with_prefix('METRICS_BACKENDS', [])
+METRICS_FILE = getattr_with_prefix('METRICS_FILE', None)
+
+# number of sample rows stored for each kind of errors
+ERROR_SAMPLES = getattr_with_prefix('ERROR_SAMPLES', 5)
+
+# seconds between checks of report cancel request
+CANCEL_INTERVAL = getattr_with_prefix('CANCEL_INTERVAL', 5)
+
+# seconds run slot and queued mark of settings kept in cache,
+# limits time of lock left by killed worker, cache shared by
+# all workers required (not local memory cache)
+LOCK_TIMEOUT = getattr_with_prefix('LOCK_TIMEOUT', 6 * 60 * 60)
+
+# seconds before task retried when all run slots are busy
+# and number of retries before run dropped
+LOCK_RETRY_DELAY = getattr_with_prefix('LOCK_RETRY_DELAY', 60)
+LOCK_MAX_RETRIES = getattr_with_prefix('LOCK_MAX_RETRIES', 6 * 60)
+
 # register models at admin for debugging
 REGISTER_IN_ADMIN = getattr_with_prefix('REGISTER_IN_ADMIN', True)
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding field 'Settings.encoding'
+        db.add_column(u'sync_settings', 'encoding',
+                      self.gf('django.db.models.fields.CharField')(default='', max_length=255, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.delimiter'
+        db.add_column(u'sync_settings', 'delimiter',
+                      self.gf('django.db.models.fields.CharField')(default='', max_length=10, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.quotechar'
+        db.add_column(u'sync_settings', 'quotechar',
+                      self.gf('django.db.models.fields.CharField')(default='', max_length=10, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Report.checkpoint'
+        db.add_column(u'sync_report', 'checkpoint',
+                      self.gf('django.db.models.fields.PositiveIntegerField')(null=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Report.rows_processed'
+        db.add_column(u'sync_report', 'rows_processed',
+                      self.gf('django.db.models.fields.PositiveIntegerField')(default=0),
+                      keep_default=False)
+
+        # Adding field 'Report.rows_total'
+        db.add_column(u'sync_report', 'rows_total',
+                      self.gf('django.db.models.fields.PositiveIntegerField')(null=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Report.errors_count'
+        db.add_column(u'sync_report', 'errors_count',
+                      self.gf('django.db.models.fields.PositiveIntegerField')(default=0),
+                      keep_default=False)
+
+        # Adding field 'Report.rate'
+        db.add_column(u'sync_report', 'rate',
+                      self.gf('django.db.models.fields.FloatField')(null=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Report.cancel_requested'
+        db.add_column(u'sync_report', 'cancel_requested',
+                      self.gf('django.db.models.fields.BooleanField')(default=False),
+                      keep_default=False)
+
+        # Adding field 'Settings.period'
+        db.add_column(u'sync_settings', 'period',
+                      self.gf('django.db.models.fields.PositiveIntegerField')(null=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.cron'
+        db.add_column(u'sync_settings', 'cron',
+                      self.gf('django.db.models.fields.CharField')(default='', max_length=255, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.next_run_at'
+        db.add_column(u'sync_settings', 'next_run_at',
+                      self.gf('django.db.models.fields.DateTimeField')(null=True, db_index=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.queue'
+        db.add_column(u'sync_settings', 'queue',
+                      self.gf('django.db.models.fields.CharField')(default='', max_length=255, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.priority'
+        db.add_column(u'sync_settings', 'priority',
+                      self.gf('django.db.models.fields.PositiveSmallIntegerField')(null=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.max_concurrency'
+        db.add_column(u'sync_settings', 'max_concurrency',
+                      self.gf('django.db.models.fields.PositiveSmallIntegerField')(default=1),
+                      keep_default=False)
+
+        # Adding field 'Report.timings'
+        db.add_column(u'sync_report', 'timings',
+                      self.gf('django.db.models.fields.TextField')(default='', blank=True),
+                      keep_default=False)
+
+        # Adding field 'Report.queries_count'
+        db.add_column(u'sync_report', 'queries_count',
+                      self.gf('django.db.models.fields.PositiveIntegerField')(default=0),
+                      keep_default=False)
+
+        # Adding field 'Report.queries_seconds'
+        db.add_column(u'sync_report', 'queries_seconds',
+                      self.gf('django.db.models.fields.FloatField')(null=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Report.queries'
+        db.add_column(u'sync_report', 'queries',
+                      self.gf('django.db.models.fields.TextField')(default='', blank=True),
+                      keep_default=False)
+
+        # Adding field 'Report.profile_file'
+        db.add_column(u'sync_report', 'profile_file',
+                      self.gf('django.db.models.fields.files.FileField')(default='', max_length=100, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Report.memory_file'
+        db.add_column(u'sync_report', 'memory_file',
+                      self.gf('django.db.models.fields.files.FileField')(default='', max_length=100, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.profile_cpu'
+        db.add_column(u'sync_settings', 'profile_cpu',
+                      self.gf('django.db.models.fields.BooleanField')(default=False),
+                      keep_default=False)
+
+        # Adding field 'Settings.profile_memory'
+        db.add_column(u'sync_settings', 'profile_memory',
+                      self.gf('django.db.models.fields.BooleanField')(default=False),
+                      keep_default=False)
+
+        # Adding field 'Error.signature'
+        db.add_column(u'sync_error', 'signature',
+                      self.gf('django.db.models.fields.CharField')(default='', max_length=40, db_index=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Error.count'
+        db.add_column(u'sync_error', 'count',
+                      self.gf('django.db.models.fields.PositiveIntegerField')(default=1),
+                      keep_default=False)
+
+        # Adding field 'Error.last_input_position'
+        db.add_column(u'sync_error', 'last_input_position',
+                      self.gf('django.db.models.fields.CharField')(default='', max_length=10, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Error.samples'
+        db.add_column(u'sync_error', 'samples',
+                      self.gf('django.db.models.fields.TextField')(default='', blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.key_fields'
+        db.add_column(u'sync_settings', 'key_fields',
+                      self.gf('django.db.models.fields.CharField')(default='', max_length=255, blank=True),
+                      keep_default=False)
+
+        # Adding field 'Settings.skip_unchanged'
+        db.add_column(u'sync_settings', 'skip_unchanged',
+                      self.gf('django.db.models.fields.BooleanField')(default=False),
+                      keep_default=False)
+
+        # Adding model 'RowHash'
+        db.create_table(u'sync_rowhash', (
+            (u'id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('settings', self.gf('django.db.models.fields.related.ForeignKey')(related_name='row_hashes', to=orm['sync.Settings'])),
+            ('key', self.gf('django.db.models.fields.CharField')(max_length=40)),
+            ('hash', self.gf('django.db.models.fields.CharField')(max_length=40)),
+            ('updated_at', self.gf('django.db.models.fields.DateTimeField')()),
+        ))
+        db.send_create_signal(u'sync', ['RowHash'])
+
+        # Adding unique constraint on 'RowHash', fields ['settings', 'key']
+        db.create_unique(u'sync_rowhash', ['settings_id', 'key'])
+
+    def backwards(self, orm):
+        # Removing unique constraint on 'RowHash', fields ['settings', 'key']
+        db.delete_unique(u'sync_rowhash', ['settings_id', 'key'])
+
+        # Deleting model 'RowHash'
+        db.delete_table(u'sync_rowhash')
+
+        # Deleting field 'Settings.encoding'
+        db.delete_column(u'sync_settings', 'encoding')
+
+        # Deleting field 'Settings.delimiter'
+        db.delete_column(u'sync_settings', 'delimiter')
+
+        # Deleting field 'Settings.quotechar'
+        db.delete_column(u'sync_settings', 'quotechar')
+
+        # Deleting field 'Report.checkpoint'
+        db.delete_column(u'sync_report', 'checkpoint')
+
+        # Deleting field 'Report.rows_processed'
+        db.delete_column(u'sync_report', 'rows_processed')
+
+        # Deleting field 'Report.rows_total'
+        db.delete_column(u'sync_report', 'rows_total')
+
+        # Deleting field 'Report.errors_count'
+        db.delete_column(u'sync_report', 'errors_count')
+
+        # Deleting field 'Report.rate'
+        db.delete_column(u'sync_report', 'rate')
+
+        # Deleting field 'Report.cancel_requested'
+        db.delete_column(u'sync_report', 'cancel_requested')
+
+        # Deleting field 'Settings.period'
+        db.delete_column(u'sync_settings', 'period')
+
+        # Deleting field 'Settings.cron'
+        db.delete_column(u'sync_settings', 'cron')
+
+        # Deleting field 'Settings.next_run_at'
+        db.delete_column(u'sync_settings', 'next_run_at')
+
+        # Deleting field 'Settings.queue'
+        db.delete_column(u'sync_settings', 'queue')
+
+        # Deleting field 'Settings.priority'
+        db.delete_column(u'sync_settings', 'priority')
+
+        # Deleting field 'Settings.max_concurrency'
+        db.delete_column(u'sync_settings', 'max_concurrency')
+
+        # Deleting field 'Report.timings'
+        db.delete_column(u'sync_report', 'timings')
+
+        # Deleting field 'Report.queries_count'
+        db.delete_column(u'sync_report', 'queries_count')
+
+        # Deleting field 'Report.queries_seconds'
+        db.delete_column(u'sync_report', 'queries_seconds')
+
+        # Deleting field 'Report.queries'
+        db.delete_column(u'sync_report', 'queries')
+
+        # Deleting field 'Report.profile_file'
+        db.delete_column(u'sync_report', 'profile_file')
+
+        # Deleting field 'Report.memory_file'
+        db.delete_column(u'sync_report', 'memory_file')
+
+        # Deleting field 'Settings.profile_cpu'
+        db.delete_column(u'sync_settings', 'profile_cpu')
+
+        # Deleting field 'Settings.profile_memory'
+        db.delete_column(u'sync_settings', 'profile_memory')
+
+        # Deleting field 'Error.signature'
+        db.delete_column(u'sync_error', 'signature')
+
+        # Deleting field 'Error.count'
+        db.delete_column(u'sync_error', 'count')
+
+        # Deleting field 'Error.last_input_position'
+        db.delete_column(u'sync_error', 'last_input_position')
+
+        # Deleting field 'Error.samples'
+        db.delete_column(u'sync_error', 'samples')
+
+        # Deleting field 'Settings.key_fields'
+        db.delete_column(u'sync_settings', 'key_fields')
+
+        # Deleting field 'Settings.skip_unchanged'
+        db.delete_column(u'sync_settings', 'skip_unchanged')
+
+
+    models = {
+        u'sync.error': {
+            'Meta': {'object_name': 'Error'},
+            'count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '1'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'input_position': ('django.db.models.fields.CharField', [], {'max_length': '10', 'blank': 'True'}),
+            'input_value': ('django.db.models.fields.TextField', [], {'max_length': '60000', 'null': 'True', 'blank': 'True'}),
+            'last_input_position': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '10'}),
+            'message': ('django.db.models.fields.TextField', [], {'max_length': '10000'}),
+            'position': ('django.db.models.fields.PositiveIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'report': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'errors'", 'to': u"orm['sync.Report']"}),
+            'samples': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'signature': ('django.db.models.fields.CharField', [], {'blank': 'True', 'db_index': 'True', 'max_length': '40'}),
+            'step': ('django.db.models.fields.PositiveSmallIntegerField', [], {'default': '10'})
+        },
+        u'sync.field': {
+            'Meta': {'ordering': "['position']", 'object_name': 'Field'},
+            'attribute': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'converters': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'position': ('django.db.models.fields.PositiveIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'settings': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'fields'", 'to': u"orm['sync.Settings']"}),
+            'skip': ('django.db.models.fields.BooleanField', [], {'default': 'False'})
+        },
+        u'sync.report': {
+            'Meta': {'ordering': "('-id',)", 'object_name': 'Report'},
+            'action': ('django.db.models.fields.PositiveSmallIntegerField', [], {'db_index': 'True'}),
+            'buffer_file': ('django.db.models.fields.files.FileField', [], {'db_index': 'True', 'max_length': '100', 'blank': 'True'}),
+            'cancel_requested': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'checkpoint': ('django.db.models.fields.PositiveIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'completed_at': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'errors_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'memory_file': ('django.db.models.fields.files.FileField', [], {'blank': 'True', 'max_length': '100'}),
+            'profile_file': ('django.db.models.fields.files.FileField', [], {'blank': 'True', 'max_length': '100'}),
+            'queries': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'queries_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'queries_seconds': ('django.db.models.fields.FloatField', [], {'blank': 'True', 'null': 'True'}),
+            'rate': ('django.db.models.fields.FloatField', [], {'blank': 'True', 'null': 'True'}),
+            'rows_processed': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'rows_total': ('django.db.models.fields.PositiveIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'settings': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'reports'", 'null': 'True', 'to': u"orm['sync.Settings']"}),
+            'started_at': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'status': ('django.db.models.fields.PositiveSmallIntegerField', [], {'default': '1'}),
+            'timings': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'updated_at': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'})
+        },
+        u'sync.rowhash': {
+            'Meta': {'unique_together': "(('settings', 'key'),)", 'object_name': 'RowHash'},
+            'hash': ('django.db.models.fields.CharField', [], {'max_length': '40'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'key': ('django.db.models.fields.CharField', [], {'max_length': '40'}),
+            'settings': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'row_hashes'", 'to': u"orm['sync.Settings']"}),
+            'updated_at': ('django.db.models.fields.DateTimeField', [], {})
+        },
+        u'sync.settings': {
+            'Meta': {'ordering': "('-id',)", 'object_name': 'Settings'},
+            'action': ('django.db.models.fields.PositiveSmallIntegerField', [], {'db_index': 'True'}),
+            'buffer_file': ('django.db.models.fields.files.FileField', [], {'db_index': 'True', 'max_length': '100', 'blank': 'True'}),
+            'created_at': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'cron': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '255'}),
+            'data_action': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'dataset': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'delimiter': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '10'}),
+            'encoding': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '255'}),
+            'end_col': ('django.db.models.fields.CharField', [], {'max_length': '10', 'blank': 'True'}),
+            'end_row': ('django.db.models.fields.PositiveIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'filename': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'include_header': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'key_fields': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '255'}),
+            'main_model': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'max_concurrency': ('django.db.models.fields.PositiveSmallIntegerField', [], {'default': '1'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'next_run_at': ('django.db.models.fields.DateTimeField', [], {'blank': 'True', 'db_index': 'True', 'null': 'True'}),
+            'period': ('django.db.models.fields.PositiveIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'priority': ('django.db.models.fields.PositiveSmallIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'processor': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'profile_cpu': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'profile_memory': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'queue': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '255'}),
+            'quotechar': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '10'}),
+            'skip_unchanged': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'start_col': ('django.db.models.fields.CharField', [], {'max_length': '10', 'blank': 'True'}),
+            'start_row': ('django.db.models.fields.PositiveIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'updated_at': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'}),
+            'worksheet': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'})
+        }
+    }
+
+    complete_apps = ['sync']
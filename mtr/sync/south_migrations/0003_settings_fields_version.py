@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding field 'Settings.fields_version'
+        db.add_column(u'sync_settings', 'fields_version',
+                      self.gf('django.db.models.fields.PositiveIntegerField')(default=0),
+                      keep_default=False)
+
+    def backwards(self, orm):
+        # Deleting field 'Settings.fields_version'
+        db.delete_column(u'sync_settings', 'fields_version')
+
+    models = {
+        u'sync.error': {
+            'Meta': {'object_name': 'Error'},
+            'count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '1'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'input_position': ('django.db.models.fields.CharField', [], {'max_length': '10', 'blank': 'True'}),
+            'input_value': ('django.db.models.fields.TextField', [], {'max_length': '60000', 'null': 'True', 'blank': 'True'}),
+            'last_input_position': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '10'}),
+            'message': ('django.db.models.fields.TextField', [], {'max_length': '10000'}),
+            'position': ('django.db.models.fields.PositiveIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'report': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'errors'", 'to': u"orm['sync.Report']"}),
+            'samples': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'signature': ('django.db.models.fields.CharField', [], {'blank': 'True', 'db_index': 'True', 'max_length': '40'}),
+            'step': ('django.db.models.fields.PositiveSmallIntegerField', [], {'default': '10'})
+        },
+        u'sync.field': {
+            'Meta': {'ordering': "['position']", 'object_name': 'Field'},
+            'attribute': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'converters': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'position': ('django.db.models.fields.PositiveIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'settings': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'fields'", 'to': u"orm['sync.Settings']"}),
+            'skip': ('django.db.models.fields.BooleanField', [], {'default': 'False'})
+        },
+        u'sync.report': {
+            'Meta': {'ordering': "('-id',)", 'object_name': 'Report'},
+            'action': ('django.db.models.fields.PositiveSmallIntegerField', [], {'db_index': 'True'}),
+            'buffer_file': ('django.db.models.fields.files.FileField', [], {'db_index': 'True', 'max_length': '100', 'blank': 'True'}),
+            'cancel_requested': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'checkpoint': ('django.db.models.fields.PositiveIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'completed_at': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'errors_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'memory_file': ('django.db.models.fields.files.FileField', [], {'blank': 'True', 'max_length': '100'}),
+            'profile_file': ('django.db.models.fields.files.FileField', [], {'blank': 'True', 'max_length': '100'}),
+            'queries': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'queries_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'queries_seconds': ('django.db.models.fields.FloatField', [], {'blank': 'True', 'null': 'True'}),
+            'rate': ('django.db.models.fields.FloatField', [], {'blank': 'True', 'null': 'True'}),
+            'rows_processed': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'rows_total': ('django.db.models.fields.PositiveIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'settings': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'reports'", 'null': 'True', 'to': u"orm['sync.Settings']"}),
+            'started_at': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'status': ('django.db.models.fields.PositiveSmallIntegerField', [], {'default': '1'}),
+            'timings': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'updated_at': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'})
+        },
+        u'sync.rowhash': {
+            'Meta': {'unique_together': "(('settings', 'key'),)", 'object_name': 'RowHash'},
+            'hash': ('django.db.models.fields.CharField', [], {'max_length': '40'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'key': ('django.db.models.fields.CharField', [], {'max_length': '40'}),
+            'settings': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'row_hashes'", 'to': u"orm['sync.Settings']"}),
+            'updated_at': ('django.db.models.fields.DateTimeField', [], {})
+        },
+        u'sync.settings': {
+            'Meta': {'ordering': "('-id',)", 'object_name': 'Settings'},
+            'action': ('django.db.models.fields.PositiveSmallIntegerField', [], {'db_index': 'True'}),
+            'buffer_file': ('django.db.models.fields.files.FileField', [], {'db_index': 'True', 'max_length': '100', 'blank': 'True'}),
+            'created_at': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'cron': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '255'}),
+            'data_action': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'dataset': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'delimiter': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '10'}),
+            'encoding': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '255'}),
+            'end_col': ('django.db.models.fields.CharField', [], {'max_length': '10', 'blank': 'True'}),
+            'end_row': ('django.db.models.fields.PositiveIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'fields_version': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'filename': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            u'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'include_header': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'key_fields': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '255'}),
+            'main_model': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'max_concurrency': ('django.db.models.fields.PositiveSmallIntegerField', [], {'default': '1'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'next_run_at': ('django.db.models.fields.DateTimeField', [], {'blank': 'True', 'db_index': 'True', 'null': 'True'}),
+            'period': ('django.db.models.fields.PositiveIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'priority': ('django.db.models.fields.PositiveSmallIntegerField', [], {'blank': 'True', 'null': 'True'}),
+            'processor': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'profile_cpu': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'profile_memory': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'queue': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '255'}),
+            'quotechar': ('django.db.models.fields.CharField', [], {'blank': 'True', 'max_length': '10'}),
+            'skip_unchanged': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'start_col': ('django.db.models.fields.CharField', [], {'max_length': '10', 'blank': 'True'}),
+            'start_row': ('django.db.models.fields.PositiveIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'updated_at': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'}),
+            'worksheet': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'})
+        }
+    }
+
+    complete_apps = ['sync']
@@ -1,24 +1,137 @@
+import logging
+
 from celery import shared_task
+from celery.signals import worker_process_init
+
+from django.conf import settings as django_settings
+from django.db import connections
+from django.db.models import Q
+from django.core.cache import cache
+from django.utils import timezone
 
 from .api import manager
-from .models import Settings
+from .api.helpers import models_registry, preload_modules
+from .api.exceptions import SlotsBusy
+from .models import Settings, Report
 from .helpers import make_from_params
+from .settings import WORKER_WARM_UP, LOCK_RETRY_DELAY, LOCK_MAX_RETRIES
+
+logger = logging.getLogger('mtr.sync.tasks')
 
 # TODO: make tasks run from seperate process
 
 
-@shared_task
-def export_data(params, data=None):
-    manager.export_data(
-        make_from_params(Settings, params), data)
+def _local_cache():
+    """Return True if default cache is not shared between processes"""
 
+    backend = django_settings.CACHES.get('default', {}).get('BACKEND', '')
+    return backend.endswith('LocMemCache')
 
-@shared_task
-def import_data(params, path=None):
-    manager.import_data(
-        make_from_params(Settings, params), path)
+
+def run_locked(task, settings, func):
+    """Run func in free slot of settings, task retried later
+    if max concurrent runs reached, dropped after LOCK_MAX_RETRIES
+    or at once if task run eagerly"""
+
+    if not settings.id:
+        return func()
+
+    queued = settings.cache_key('queued')
+    eager = getattr(task.request, 'is_eager', False)
+
+    if settings.max_concurrency and not eager and _local_cache():
+        logger.warning(
+            'Run slots of settings %s kept in local memory cache, '
+            'concurrent runs of workers not limited', settings.id)
+
+    # run stays queued while task waits for slot,
+    # eager retry would run again at once
+    if settings.max_concurrency and settings.acquire_slot() is None:
+        if eager or task.request.retries >= LOCK_MAX_RETRIES():
+            cache.delete(queued)
+            raise SlotsBusy(
+                'All run slots of settings {} are busy'.format(settings.id))
+
+        raise task.retry(countdown=LOCK_RETRY_DELAY())
+
+    cache.delete(queued)
+
+    try:
+        return func()
+    finally:
+        settings.release_slot()
+
+
+@shared_task(bind=True, max_retries=None)
+def export_data(self, params, data=None, profile=None):
+    settings = make_from_params(Settings, params)
+
+    run_locked(self, settings, lambda: manager.export_data(
+        settings, data, profile=profile))
+
+
+@shared_task(bind=True, max_retries=None)
+def import_data(self, params, path=None, resume=None, profile=None):
+    settings = make_from_params(Settings, params)
+
+    if resume is not None:
+        resume = Report.objects.get(pk=resume)
+
+    run_locked(self, settings, lambda: manager.import_data(
+        settings, path, resume=resume, profile=profile))
 
 
 @shared_task
 def check_periodic_export():
-    pass
+    """Run exports with due schedule, settings with running reports
+    skip this run, next run time updated only if it not changed
+    by concurrent check"""
+
+    now = timezone.now()
+    due = Settings.objects \
+        .filter(action=Settings.EXPORT, next_run_at__lte=now)
+    running = set(due.filter(reports__status=Report.RUNNING)
+                  .values_list('pk', flat=True))
+
+    for settings in due:
+        locked = Settings.objects \
+            .filter(pk=settings.pk, next_run_at=settings.next_run_at) \
+            .update(next_run_at=settings.schedule_next(now))
+
+        if locked and settings.pk not in running:
+            settings.run()
+
+
+def warm_up():
+    """Build models registry, import processors libraries and compile
+    fields of settings which can be run by worker"""
+
+    models_registry()
+    preload_modules()
+
+    scheduled = Settings.objects.filter(
+        Q(next_run_at__isnull=False) | Q(reports__status=Report.RUNNING))
+
+    for settings in scheduled.distinct():
+        settings.fields_with_processors()
+
+
+# connections inherited from parent process, kept to not close them
+_inherited_connections = []
+
+
+def discard_connections():
+    """Drop connections inherited from parent process without closing,
+    closing shared socket breaks connection of parent"""
+
+    for connection in connections.all():
+        if connection.connection is not None:
+            _inherited_connections.append(connection.connection)
+            connection.connection = None
+
+
+@worker_process_init.connect
+def warm_up_worker(**kwargs):
+    if WORKER_WARM_UP():
+        discard_connections()
+        warm_up()
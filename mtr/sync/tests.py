@@ -8,10 +8,12 @@ import datetime
 from collections import OrderedDict
 
 from django.utils import six
+from django.test.utils import override_settings
 
 from mtr.sync.api import manager
 from mtr.sync.api.helpers import column_value
-from mtr.sync.models import Settings
+from mtr.sync.api.signals import error_raised
+from mtr.sync.models import Settings, Report, Error
 
 
 class ApiTestMixin(object):
@@ -108,7 +110,11 @@ class ProcessorTestMixin(ApiTestMixin):
 
         report = self.manager.import_data(self.settings)
 
-        self.assertEqual(report.errors.count(), self.settings.end_row)
+        self.assertEqual(
+            sum(report.errors.values_list('count', flat=True)),
+            self.settings.end_row)
+        self.assertEqual(report.errors_count, self.settings.end_row)
+        self.assertLess(report.errors.count(), self.settings.end_row)
 
         self.check_file_existence_and_delete(report)
 
@@ -205,6 +211,186 @@ class ProcessorTestMixin(ApiTestMixin):
 
         self.assertEqual(before, self.queryset.count())
 
+    def test_report_progress(self):
+        report = self.check_report_success()
+        count = self.queryset.count()
+
+        report = Report.objects.get(pk=report.pk)
+        self.assertEqual(report.rows_processed, count)
+        self.assertEqual(report.rows_total, count)
+        self.assertEqual(report.errors_count, 0)
+        self.assertEqual(report.progress(), 100)
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+        imported = self.manager.import_data(self.settings)
+
+        imported = Report.objects.get(pk=imported.pk)
+        self.assertEqual(imported.rows_processed, count)
+        self.assertEqual(imported.progress(), 100)
+
+        self.check_file_existence_and_delete(report)
+
+    @override_settings(
+        MTR_SYNC_PROGRESS_ROWS=1000000, MTR_SYNC_PROGRESS_INTERVAL=0)
+    def test_report_progress_by_interval(self):
+        report = self.check_report_success()
+
+        processor = self.manager.make_processor(self.settings)
+        processor.report = report
+        processor.start_progress(1000)
+
+        # chunk sizes are not multiple of per row check
+        processor.update_progress(10)
+        self.assertEqual(
+            Report.objects.get(pk=report.pk).rows_processed, 10)
+
+        processor.update_progress(20, every=64)
+        self.assertEqual(
+            Report.objects.get(pk=report.pk).rows_processed, 10)
+
+        self.check_file_existence_and_delete(report)
+
+    def test_report_stage_timings(self):
+        report = self.check_report_success()
+        count = self.queryset.count()
+
+        timings = dict(
+            (label, calls) for label, seconds, calls
+            in Report.objects.get(pk=report.pk).stage_timings())
+        steps = dict(Error.STEP_CHOICES)
+
+        self.assertEqual(timings[steps[Error.WRITE_DATA]], count)
+        self.assertEqual(timings[steps[Error.SAVE_FILE]], 1)
+
+        report = Report.objects.get(pk=report.pk)
+        self.assertGreater(report.queries_count, 0)
+        self.assertTrue(report.top_queries())
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+        imported = self.manager.import_data(self.settings)
+
+        timings = dict(
+            (label, calls) for label, seconds, calls
+            in Report.objects.get(pk=imported.pk).stage_timings())
+
+        self.assertEqual(timings[steps[Error.READ_FILE]], count)
+        self.assertEqual(timings[steps[Error.IMPORT_DATA]], count)
+
+        self.check_file_existence_and_delete(report)
+
+    def test_resume_import_from_checkpoint(self):
+        report = self.check_report_success()
+
+        count = self.queryset.count()
+        self.queryset.delete()
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+
+        resume = Report.objects.create(
+            action=Report.IMPORT, buffer_file=report.buffer_file,
+            checkpoint=1)
+        resumed = self.manager.import_data(self.settings, resume=resume)
+
+        self.assertEqual(resumed.pk, resume.pk)
+        self.assertEqual(resumed.checkpoint, count - 1)
+        self.assertEqual(resumed.rows_processed, count)
+        self.assertEqual(self.queryset.count(), count - 2)
+
+        self.check_file_existence_and_delete(report)
+
+    def test_resume_import_merges_errors(self):
+        report = self.check_report_success()
+        count = self.queryset.count()
+        self.queryset.delete()
+
+        @self.manager.register('action')
+        def fail_import(row, model, model_attrs, related_attrs, processor):
+            error_raised.send(
+                processor, error='not imported', position=row,
+                step=Error.IMPORT_DATA)
+
+        self.settings.data_action = 'fail_import'
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+
+        failed = self.manager.import_data(self.settings)
+        Report.objects.filter(pk=failed.pk).update(checkpoint=1)
+        resumed = self.manager.import_data(
+            self.settings, resume=Report.objects.get(pk=failed.pk))
+        self.manager.unregister('action', fail_import)
+
+        error = Error.objects.get(report=resumed)
+        self.assertEqual(error.count, count * 2 - 2)
+        self.assertEqual(resumed.errors_count, count * 2 - 2)
+
+        self.check_file_existence_and_delete(report)
+
+    def test_errors_counts_saved_when_import_failed(self):
+        report = self.check_report_success()
+        self.queryset.delete()
+        rows = []
+
+        @self.manager.register('action')
+        def fail_import(row, model, model_attrs, related_attrs, processor):
+            rows.append(row)
+            if len(rows) > 2:
+                raise RuntimeError('import failed')
+
+            error_raised.send(
+                processor, error='not imported', position=row,
+                step=Error.IMPORT_DATA)
+
+        self.settings.data_action = 'fail_import'
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+
+        try:
+            with self.assertRaises(RuntimeError):
+                self.manager.import_data(self.settings)
+        finally:
+            self.manager.unregister('action', fail_import)
+
+        error = Error.objects.get(message='not imported')
+        self.assertEqual(error.count, 2)
+
+        self.check_file_existence_and_delete(report)
+
+    @override_settings(MTR_SYNC_CANCEL_INTERVAL=0)
+    def test_cancel_import(self):
+        report = self.check_report_success()
+        count = self.queryset.count()
+        self.queryset.delete()
+
+        @self.manager.register('action')
+        def cancel_import(row, model, model_attrs, related_attrs, processor):
+            processor.report.cancel()
+            model.objects.create(**model_attrs)
+
+        self.settings.data_action = 'cancel_import'
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+
+        cancelled = self.manager.import_data(self.settings)
+        self.manager.unregister('action', cancel_import)
+
+        self.assertEqual(cancelled.status, Report.CANCELLED)
+        self.assertEqual(self.queryset.count(), 0)
+
+        # imported file kept to resume cancelled import
+        cancelled = Report.objects.get(pk=cancelled.pk)
+        self.assertEqual(cancelled.buffer_file.path, report.buffer_file.path)
+
+        self.settings.data_action = ''
+        resumed = self.manager.import_data(self.settings, resume=cancelled)
+
+        self.assertEqual(resumed.status, Report.SUCCESS)
+        self.assertEqual(self.queryset.count(), count)
+
+        self.check_file_existence_and_delete(report)
+
     def test_reading_empty_values(self):
         report = self.check_report_success()
 
@@ -0,0 +1,313 @@
+"""Benchmarks of export and import for registered processors
+on synthetic data of Person, Office and Tag models"""
+
+from __future__ import division
+
+import os
+import gc
+
+from django.utils.six.moves import range, zip
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from mtr.sync.api import manager
+from mtr.sync.api.profiling import QueryRecorder, clock
+from mtr.sync.models import Settings
+
+from .models import Person, Office, Tag
+
+# default sizes handled by all processors, large sizes
+# passed explicitly with --sizes
+SIZES = (10000,)
+LARGE_SIZES = (100000, 1000000)
+PROCESSORS = ('CsvProcessor', 'XlsProcessor', 'XlsxProcessor', 'OdsProcessor')
+
+# rows limits of formats, larger sizes skipped for processor
+MAX_ROWS = {
+    'XlsProcessor': 65535,
+}
+
+FLAT_FIELDS = ('name', 'surname', 'gender', 'security_level')
+RELATED_FIELDS = FLAT_FIELDS + (
+    'office|_fk_|office', 'office|_fk_|address', 'tags|_m_|name')
+
+SCENARIOS = {
+    'flat': FLAT_FIELDS,
+    'related': RELATED_FIELDS,
+}
+
+BATCH_SIZE = 10000
+
+
+def populate(rows, related=True):
+    """Replace persons with rows of generated data"""
+
+    Person.objects.all().delete()
+    Office.objects.all().delete()
+    Tag.objects.all().delete()
+
+    office, tags = None, []
+
+    if related:
+        office = Office.objects.create(office='office', address='address')
+        tags = [Tag.objects.create(name='tag{}'.format(i)) for i in range(2)]
+
+    for start in range(0, rows, BATCH_SIZE):
+        Person.objects.bulk_create([
+            Person(
+                name='name{}'.format(index),
+                surname='surname{}'.format(index),
+                gender='MF'[index % 2],
+                security_level=index % 100,
+                office=office)
+            for index in range(start, min(start + BATCH_SIZE, rows))])
+
+    if tags:
+        through = Person.tags.through
+        persons = Person.objects.values_list('id', flat=True).iterator()
+
+        while True:
+            batch = [
+                through(person_id=person_id, tag_id=tag.id)
+                for _, person_id in zip(range(BATCH_SIZE), persons)
+                for tag in tags]
+
+            if not batch:
+                break
+
+            through.objects.bulk_create(batch)
+
+
+def make_settings(processor, fields):
+    settings = Settings.objects.create(
+        action=Settings.EXPORT, processor=processor, include_header=False,
+        main_model='{}.{}'.format(Person.__module__, Person.__name__))
+
+    for attribute in fields:
+        settings.fields.create(attribute=attribute, converters='auto')
+
+    return settings
+
+
+def measure(func, setup=None, cleanup=None, memory=False):
+    """Return result of func, seconds, queries count and peak memory
+    in bytes, memory measured in separate run because tracing
+    slows down execution"""
+
+    gc.collect()
+    if setup is not None:
+        setup()
+
+    with QueryRecorder() as counter:
+        start = clock()
+        result = func()
+        seconds = clock() - start
+
+    peak = None
+    if memory and tracemalloc is not None:
+        if setup is not None:
+            setup()
+
+        tracemalloc.start()
+        try:
+            traced = func()
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        if cleanup is not None:
+            cleanup(traced)
+
+    return result, seconds, counter.count, peak
+
+
+def run_scenario(processor, rows, scenario, memory=True):
+    """Export and import rows with processor and return results"""
+
+    fields = SCENARIOS[scenario]
+    populate(rows, related=fields is RELATED_FIELDS)
+    settings = make_settings(processor, fields)
+    results = []
+
+    def result(operation, seconds, queries, peak):
+        results.append({
+            'processor': processor,
+            'rows': rows,
+            'scenario': scenario,
+            'operation': operation,
+            'seconds': seconds,
+            'rows_per_second': rows / seconds if seconds else None,
+            'queries': queries,
+            'peak_memory': peak,
+        })
+
+    def remove_file(report):
+        os.remove(report.buffer_file.path)
+
+    report, seconds, queries, peak = measure(
+        lambda: manager.export_data(settings),
+        cleanup=remove_file, memory=memory)
+    result('export', seconds, queries, peak)
+
+    settings.action = settings.IMPORT
+    settings.buffer_file = report.buffer_file
+    settings.save()
+
+    def clear():
+        Person.objects.all().delete()
+
+    imported, seconds, queries, peak = measure(
+        lambda: manager.import_data(settings), setup=clear, memory=memory)
+    result('import', seconds, queries, peak)
+
+    remove_file(report)
+
+    return results
+
+
+def percentile(values, percent):
+    """Return percentile of values with linear interpolation"""
+
+    values = sorted(values)
+    position = (len(values) - 1) * percent / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def summarize(runs):
+    """Join results of repeated runs to medians and interquartile
+    ranges of seconds, throughput and peak memory"""
+
+    result = dict(runs[0])
+    result['repeat'] = len(runs)
+
+    for name in ('seconds', 'rows_per_second', 'peak_memory', 'queries'):
+        values = [run[name] for run in runs if run[name] is not None]
+        if not values:
+            continue
+
+        result[name] = percentile(values, 50)
+        result['{}_iqr'.format(name)] = \
+            percentile(values, 75) - percentile(values, 25)
+
+    return result
+
+
+def result_key(result):
+    return '{processor}/{scenario}/{rows}/{operation}'.format(**result)
+
+
+def run(
+        sizes=SIZES, processors=PROCESSORS, scenarios=None, memory=True,
+        repeat=1):
+    """Run benchmarks for all combinations repeat times
+    and return list of summarized results"""
+
+    results = []
+
+    for processor in processors:
+        for rows in sizes:
+            if rows > MAX_ROWS.get(processor, rows):
+                continue
+
+            for scenario in scenarios or sorted(SCENARIOS.keys()):
+                runs = {}
+
+                try:
+                    for index in range(repeat):
+                        for result in run_scenario(
+                                processor, rows, scenario, memory):
+                            runs.setdefault(result['operation'], []) \
+                                .append(result)
+                except Exception as e:
+                    results.append({
+                        'processor': processor,
+                        'rows': rows,
+                        'scenario': scenario,
+                        'operation': 'all',
+                        'error': repr(e),
+                    })
+                    continue
+
+                for operation in sorted(runs.keys()):
+                    results.append(summarize(runs[operation]))
+
+    return results
+
+
+def baseline_succeeded(baseline, result):
+    """Return True if baseline has results of operations of failed run"""
+
+    keys = [result_key(dict(result, operation=operation))
+            for operation in ('export', 'import')]
+
+    return any(
+        key in baseline and 'error' not in baseline[key] for key in keys)
+
+
+def compare(baseline, results, threshold=0.1):
+    """Compare results with baseline by keys, return rows of
+    key, metric, baseline value, current value, relative change and
+    regression flag. Throughput regressed if it dropped more than
+    threshold and more than interquartile ranges of both runs, memory
+    if peak grows more than threshold"""
+
+    rows = []
+
+    for result in results:
+        key = result_key(result)
+        base = baseline.get(key, None)
+
+        if 'error' in result:
+            # error is regression only if baseline run succeeded
+            if baseline_succeeded(baseline, result):
+                rows.append((key, 'error', None, None, None, True))
+            continue
+        elif base is None or 'error' in base:
+            continue
+
+        old, new = base['rows_per_second'], result['rows_per_second']
+        if old and new:
+            noise = base.get('rows_per_second_iqr', 0) + \
+                result.get('rows_per_second_iqr', 0)
+            regressed = new < old * (1 - threshold) and old - new > noise
+            rows.append((
+                key, 'rows_per_second', old, new, new / old - 1, regressed))
+
+        old, new = base.get('peak_memory'), result.get('peak_memory')
+        if old and new:
+            regressed = new > old * (1 + threshold)
+            rows.append((
+                key, 'peak_memory', old, new, new / old - 1, regressed))
+
+    return rows
+
+
+def format_table(rows):
+    """Return text table of compare rows"""
+
+    def value(item):
+        if item is None:
+            return '-'
+        elif isinstance(item, float):
+            return '{:.1f}'.format(item)
+        return str(item)
+
+    lines = [('key', 'metric', 'baseline', 'current', 'change', '')]
+    for key, metric, old, new, change, regressed in rows:
+        lines.append((
+            key, metric, value(old), value(new),
+            '-' if change is None else '{:+.1%}'.format(change),
+            'REGRESSION' if regressed else ''))
+
+    widths = [max(len(line[index]) for line in lines)
+              for index in range(len(lines[0]))]
+
+    return '\n'.join(
+        '  '.join(cell.ljust(width) for cell, width in zip(line, widths))
+        .rstrip() for line in lines)
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app import benchmarks
+
+BASELINE = os.path.join(
+    os.path.dirname(__file__), os.path.pardir, os.path.pardir,
+    os.path.pardir, 'benchmarks.json')
+
+
+def split_option(value, cast=str):
+    return [cast(item) for item in value.split(',') if item]
+
+
+class Command(BaseCommand):
+
+    help = 'Measure export and import of processors on generated data ' \
+        'at separate test database, print results as json or compare ' \
+        'them with baseline'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--sizes', default=','.join(map(str, benchmarks.SIZES)),
+            help='Comma separated rows counts, for example {}'.format(
+                ','.join(map(str, benchmarks.LARGE_SIZES)))),
+        make_option(
+            '--processors', default=','.join(benchmarks.PROCESSORS),
+            help='Comma separated processors names'),
+        make_option(
+            '--scenarios', default='',
+            help='Comma separated scenarios: flat, related'),
+        make_option(
+            '--no-memory', action='store_false', dest='memory', default=True,
+            help='Skip peak memory measurement run'),
+        make_option(
+            '--repeat', type='int', default=1,
+            help='Runs of each scenario, medians are reported'),
+        make_option(
+            '--output', default='',
+            help='Write results to file instead of stdout'),
+        make_option(
+            '--baseline', default=BASELINE,
+            help='Path to baseline json file'),
+        make_option(
+            '--save-baseline', action='store_true', default=False,
+            help='Update baseline with results'),
+        make_option(
+            '--compare', action='store_true', default=False,
+            help='Compare results with baseline, fail on regressions'),
+        make_option(
+            '--threshold', type='float', default=0.1,
+            help='Allowed relative regression for compare'),
+    )
+
+    def handle(self, *args, **options):
+        verbosity = int(options.get('verbosity', 1))
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity, autoclobber=True)
+
+        try:
+            results = benchmarks.run(
+                sizes=split_option(options['sizes'], int),
+                processors=split_option(options['processors']),
+                scenarios=split_option(options['scenarios']),
+                memory=options['memory'], repeat=options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity)
+
+        output = json.dumps(results, indent=2, sort_keys=True)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        elif not options['compare']:
+            sys.stdout.write(output)
+            sys.stdout.write('\n')
+
+        if options['compare']:
+            self.compare(options['baseline'], results, options['threshold'])
+
+        if options['save_baseline']:
+            self.save_baseline(options['baseline'], results)
+
+    def load_baseline(self, path):
+        if not os.path.exists(path):
+            return {}
+
+        with open(path) as f:
+            return json.load(f)
+
+    def save_baseline(self, path, results):
+        """Update baseline entries of measured keys"""
+
+        baseline = self.load_baseline(path)
+        for result in results:
+            if 'error' not in result:
+                baseline[benchmarks.result_key(result)] = result
+
+        with open(path, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    def compare(self, path, results, threshold):
+        baseline = self.load_baseline(path)
+        if not baseline:
+            raise CommandError('No baseline at {}'.format(path))
+
+        rows = benchmarks.compare(baseline, results, threshold)
+        sys.stdout.write(benchmarks.format_table(rows))
+        sys.stdout.write('\n')
+
+        regressions = [row for row in rows if row[-1]]
+        if regressions:
+            raise CommandError(
+                '{} regressions beyond {:.0%} threshold'.format(
+                    len(regressions), threshold))
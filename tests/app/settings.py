@@ -8,6 +8,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/1.7/ref/settings/
 """
 
+import datetime
+
 import django
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -116,3 +118,10 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_ALWAYS_EAGER = True
 CELERY_EAGER_PROPAGATES_EXCEPTIONS = True
+
+CELERYBEAT_SCHEDULE = {
+    'check-periodic-export': {
+        'task': 'mtr.sync.tasks.check_periodic_export',
+        'schedule': datetime.timedelta(minutes=1),
+    },
+}
@@ -0,0 +1,271 @@
+import os
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.exceptions import ValidationError
+
+from mtr.sync.tests import ApiTestMixin
+from mtr.sync.models import Report, Error
+from mtr.sync.api.processors import csv
+from mtr.sync.api.actions import validation_fields, validate
+from mtr.sync.api.signals import error_raised
+
+from ...models import Person, Office, Tag
+
+
+class ValidateActionTest(ApiTestMixin, TestCase):
+    MODEL = Person
+    RELATED_MODEL = Office
+    RELATED_MANY = Tag
+    PROCESSOR = csv.CsvProcessor
+
+    def test_validation_fields(self):
+        fields, required, unique = validation_fields(Person)
+
+        self.assertNotIn('office', fields)
+        self.assertEqual(
+            set(required), set(['name', 'surname', 'gender',
+                                'security_level']))
+        self.assertEqual(unique, ['id'])
+
+    def test_validation_errors_signatures(self):
+        processor = self.manager.make_processor(self.settings)
+        processor.report = Report.objects.create(
+            action=Report.IMPORT, settings=self.settings)
+
+        errors = [
+            ValidationError(
+                'Value %(value)r is not a valid choice.',
+                code='invalid_choice', params={'value': 'X'}),
+            ValidationError(
+                'Value %(value)r is not a valid choice.',
+                code='invalid_choice', params={'value': 'Y'}),
+            ValidationError(
+                'This field cannot be blank.', code='blank'),
+        ]
+
+        for row, error in enumerate(errors):
+            error_raised.send(
+                processor, exception=error, position=row, field='gender',
+                step=Error.IMPORT_DATA)
+
+        self.assertEqual(
+            sorted(processor.report.errors.values_list('count', flat=True)),
+            [1, 1])
+        self.assertEqual(
+            sorted(error.count for error in processor.errors.values()),
+            [1, 2])
+
+    def test_validate_without_saving(self):
+        report = self.manager.export_data(self.settings)
+        rows = report.rows_processed
+        count = Person.objects.count()
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.data_action = 'validate'
+        self.settings.buffer_file = report.buffer_file
+
+        # exported primary keys exists in database
+        validated = self.manager.import_data(self.settings)
+
+        self.assertEqual(Person.objects.count(), count)
+        self.assertEqual(validated.errors_count, rows)
+        self.assertEqual(validated.errors.count(), 1)
+
+        Person.objects.all().delete()
+
+        validated = self.manager.import_data(self.settings)
+
+        self.assertEqual(Person.objects.count(), 0)
+        self.assertEqual(validated.errors_count, 0)
+
+        os.remove(report.buffer_file.path)
+
+    def test_required_values_reported_once(self):
+        processor = self.manager.make_processor(self.settings)
+        processor.report = Report.objects.create(
+            action=Report.IMPORT, settings=self.settings)
+        attrs = {'name': 'name', 'gender': 'M', 'security_level': 10}
+
+        validate(1, Person, dict(attrs, surname=''), {}, processor)
+        self.assertEqual(processor.errors_count, 1)
+
+        validate(2, Person, attrs, {}, processor)
+        self.assertEqual(processor.errors_count, 2)
+
+
+class SyncActionTest(ApiTestMixin, TestCase):
+    MODEL = Person
+    RELATED_MODEL = Office
+    RELATED_MANY = Tag
+    PROCESSOR = csv.CsvProcessor
+
+    def test_sync_inserts_updates_and_deletes(self):
+        report = self.manager.export_data(self.settings)
+        exported = set(self.queryset.values_list('id', flat=True))
+        hidden = set(Person.objects.exclude(id__in=exported)
+                     .values_list('id', flat=True))
+
+        changed, removed = sorted(exported)[:2]
+        name = Person.objects.get(pk=changed).name
+        Person.objects.filter(pk=changed).update(name='changed')
+        Person.objects.filter(pk=removed).delete()
+        extra = Person.objects.create(
+            name='extra', surname='extra', gender='M', security_level=50)
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.data_action = 'sync'
+        self.settings.key_fields = 'id'
+        self.settings.buffer_file = report.buffer_file
+
+        synced = self.manager.import_data(self.settings)
+
+        self.assertEqual(synced.errors_count, 0)
+        self.assertEqual(Person.objects.get(pk=changed).name, name)
+        self.assertEqual(
+            set(self.queryset.values_list('id', flat=True)), exported)
+        self.assertFalse(Person.objects.filter(pk=extra.pk).exists())
+        self.assertEqual(
+            set(Person.objects.exclude(id__in=exported)
+                .values_list('id', flat=True)), hidden)
+
+        os.remove(report.buffer_file.path)
+
+    def prepare_sync(self):
+        report = self.manager.export_data(self.settings)
+        extra = Person.objects.create(
+            name='extra', surname='extra', gender='M', security_level=50)
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.data_action = 'sync'
+        self.settings.key_fields = 'id'
+        self.settings.buffer_file = report.buffer_file
+
+        return report, extra
+
+    def test_sync_without_key_fields(self):
+        report, extra = self.prepare_sync()
+        self.settings.key_fields = ''
+        self.assertRaises(ValidationError, self.settings.clean)
+
+        count = Person.objects.count()
+        synced = self.manager.import_data(self.settings)
+
+        self.assertGreater(synced.errors_count, 0)
+        self.assertEqual(synced.errors_count, synced.rows_processed)
+        self.assertEqual(Person.objects.count(), count)
+        self.assertEqual(
+            Error.objects.filter(report=synced).count(), 1)
+
+        os.remove(report.buffer_file.path)
+
+    def test_sync_invalid_value_not_deleted(self):
+        report, extra = self.prepare_sync()
+        path = report.buffer_file.path
+        processor = self.manager.make_processor(self.settings)
+
+        f, kwargs = processor._open(path, 'r')
+        with f:
+            rows = list(csv.csv.reader(f, **kwargs))
+
+        col = [field.attribute for field in self.fields] \
+            .index('security_level')
+        rows[0][col] = 'invalid'
+        invalid = int(rows[0][0])
+
+        f, kwargs = processor._open(path, 'w')
+        with f:
+            csv.csv.writer(f, **kwargs).writerows(rows)
+
+        synced = self.manager.import_data(self.settings)
+
+        # missing rows are not deleted if import has errors
+        self.assertEqual(synced.errors_count, 1)
+        self.assertTrue(Person.objects.filter(pk=invalid).exists())
+        self.assertTrue(Person.objects.filter(pk=extra.pk).exists())
+
+        os.remove(path)
+
+    def test_sync_limited_rows_not_deleted(self):
+        report, extra = self.prepare_sync()
+        exported = set(self.queryset.values_list('id', flat=True))
+        self.settings.end_row = 2
+
+        synced = self.manager.import_data(self.settings)
+
+        self.assertEqual(synced.errors_count, 0)
+        self.assertEqual(
+            set(self.queryset.values_list('id', flat=True)),
+            exported | set([extra.pk]))
+
+        os.remove(report.buffer_file.path)
+
+    def test_sync_preview_is_limited(self):
+        report, extra = self.prepare_sync()
+
+        processor = self.manager.make_processor(self.settings)
+        max_rows, max_cols = processor.open(report.buffer_file.path)
+        processor.set_dimensions(0, 0, max_rows, max_cols, import_data=True)
+        self.assertFalse(processor.limited)
+
+        with override_settings(MTR_SYNC_LIMIT_PREVIEW=2):
+            processor.set_dimensions(
+                0, 0, max_rows, max_cols, preview=True, import_data=True)
+        self.assertTrue(processor.limited)
+
+        processor.close()
+        os.remove(report.buffer_file.path)
+
+    def test_sync_skip_unchanged(self):
+        report = self.manager.export_data(self.settings)
+        exported = set(self.queryset.values_list('id', flat=True))
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.data_action = 'sync'
+        self.settings.key_fields = 'id'
+        self.settings.skip_unchanged = True
+        self.settings.buffer_file = report.buffer_file
+
+        self.manager.import_data(self.settings)
+        self.assertEqual(self.settings.row_hashes.count(), len(exported))
+
+        # unchanged rows of file are not processed and not deleted
+        changed = min(exported)
+        Person.objects.filter(pk=changed).update(name='changed')
+
+        synced = self.manager.import_data(self.settings)
+
+        self.assertEqual(synced.errors_count, 0)
+        self.assertEqual(Person.objects.get(pk=changed).name, 'changed')
+        self.assertEqual(
+            set(self.queryset.values_list('id', flat=True)), exported)
+        self.assertEqual(self.settings.row_hashes.count(), len(exported))
+
+        # hashes of rows after end row are not pruned
+        self.settings.end_row = 2
+        self.manager.import_data(self.settings)
+        self.assertEqual(self.settings.row_hashes.count(), len(exported))
+
+        os.remove(report.buffer_file.path)
+
+    def test_validate_not_saves_hashes(self):
+        report = self.manager.export_data(self.settings)
+        count = self.queryset.count()
+        self.queryset.delete()
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.data_action = 'validate'
+        self.settings.key_fields = 'id'
+        self.settings.skip_unchanged = True
+        self.settings.buffer_file = report.buffer_file
+
+        self.manager.import_data(self.settings)
+        self.assertEqual(self.settings.row_hashes.count(), 0)
+
+        self.settings.data_action = 'create'
+        self.manager.import_data(self.settings)
+
+        self.assertEqual(self.queryset.count(), count)
+        self.assertEqual(self.settings.row_hashes.count(), count)
+
+        os.remove(report.buffer_file.path)
@@ -1,7 +1,9 @@
 from django.test import TestCase
+from django.test.utils import override_settings
 
 from mtr.sync.api.helpers import column_name, column_index, column_value, \
-    model_attributes, process_attribute
+    model_attributes, process_attribute, make_model_class, models_registry, \
+    model_fields, clear_models_cache, unique_names
 from mtr.sync.tests import ApiTestMixin
 from mtr.sync.api.processors import csv
 
@@ -24,6 +26,11 @@ class HelpersTest(ApiTestMixin, TestCase):
         self.assertEqual(column_index('A'), 0)
         self.assertEqual(column_index('Z'), 25)
 
+    def test_unique_names(self):
+        self.assertEqual(
+            unique_names(['a', 'b', 'a', 'a_2', 'a']),
+            ['a', 'b', 'a_3', 'a_2', 'a_4'])
+
     def test_model_attributes(self):
         fields = model_attributes(self.settings)
         fields = list(map(lambda f: f[0], fields))
@@ -34,6 +41,32 @@ class HelpersTest(ApiTestMixin, TestCase):
             'tags|_m_|id', 'tags|_m_|name',
             'custom_method', 'none_param'], fields)
 
+    def test_model_attributes_depth(self):
+        with override_settings(MTR_SYNC_MODEL_ATTRIBUTES_DEPTH=0):
+            fields = [f[0] for f in model_attributes(self.settings)]
+
+        self.assertIn('office', fields)
+        self.assertNotIn('office|_fk_|id', fields)
+
+        fields = [f[0] for f in model_attributes(self.settings)]
+        self.assertIn('office|_fk_|id', fields)
+
+    def test_models_registry(self):
+        self.assertIs(make_model_class(self.settings), Person)
+        self.assertIs(models_registry()['app.models.Office'], Office)
+
+        self.settings.main_model = 'app.models.NotExist'
+        self.assertIsNone(make_model_class(self.settings))
+
+    def test_model_fields_cached(self):
+        fields = model_fields(Person)
+        self.assertIs(model_fields(Person), fields)
+
+        clear_models_cache()
+        self.assertIsNot(model_fields(Person), fields)
+        self.assertEqual(
+            list(model_fields(Person).keys()), list(fields.keys()))
+
     def test_process_attribute(self):
         self.assertEqual(
             process_attribute(
@@ -1,8 +1,14 @@
+import os
+import tempfile
+
 from django.test import TestCase
 
 from mtr.sync.tests import ApiTestMixin
 from mtr.sync.api import Processor
 from mtr.sync.api.processors.xls import XlsProcessor
+from mtr.sync.api.processors.csv import CsvProcessor
+from mtr.sync.api.processors.jsonl import JsonLinesProcessor
+from mtr.sync.models import Settings
 from mtr.sync.api.exceptions import ItemAlreadyRegistered, \
     ItemDoesNotRegistered
 
@@ -54,6 +60,54 @@ class ManagerTest(ApiTestMixin, TestCase):
         self.assertEqual(
             list(self.manager.processors.values()), ordered_processors)
 
+    def test_detect_processor_by_file_signature(self):
+        for processor in (XlsProcessor, CsvProcessor, JsonLinesProcessor):
+            self.manager.register('processor', processor)
+
+        samples = (
+            (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1\x00\x00', XlsProcessor),
+            (b'name;surname\n1;2\n', CsvProcessor),
+            (b'{"name": "test"}\n', JsonLinesProcessor),
+            (b'\x00\x01binary', None),
+        )
+
+        for content, processor in samples:
+            fd, path = tempfile.mkstemp()
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+
+            self.assertEqual(self.manager.detect_processor(path), processor)
+            os.remove(path)
+
+    def test_fields_with_processors_cached_until_changed(self):
+        self.settings.create_default_fields()
+        fields = self.settings.fields_with_processors()
+        version = Settings.objects.get(pk=self.settings.pk).fields_version
+
+        with self.assertNumQueries(0):
+            self.assertIs(self.settings.fields_with_processors(), fields)
+
+        self.settings.fields.create(attribute='name', converters='auto')
+
+        with self.assertNumQueries(1):
+            new_fields = self.settings.fields_with_processors()
+        self.assertEqual(len(new_fields), len(fields) + 1)
+
+        settings = Settings.objects.get(pk=self.settings.pk)
+        self.assertEqual(settings.fields_version, version + 1)
+
+    def test_fields_version_changed_once_for_bulk_changes(self):
+        version = self.settings.fields_version
+
+        self.assertGreater(len(self.settings.create_default_fields()), 1)
+        settings = Settings.objects.get(pk=self.settings.pk)
+        self.assertEqual(settings.fields_version, version + 1)
+
+        # stale instance keeps changed version on save
+        self.settings.save()
+        settings = Settings.objects.get(pk=self.settings.pk)
+        self.assertEqual(settings.fields_version, version + 1)
+
     def test_registering_dict_instance_attributes(self):
         old_converters = self.manager.converters.copy()
 
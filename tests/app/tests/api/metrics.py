@@ -0,0 +1,91 @@
+import os
+import json
+import tempfile
+
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from mtr.sync.tests import ApiTestMixin
+from mtr.sync.api.processors import csv
+from mtr.sync.api.metrics import MetricsBackend
+
+from ...models import Person, Office, Tag
+
+
+class LocalMetrics(MetricsBackend):
+
+    """Stand-in for statsd like backend"""
+
+    values = []
+    flushed = 0
+
+    def emit(self, name, value, tags):
+        self.values.append((name, value, tags))
+
+    def flush(self):
+        LocalMetrics.flushed += 1
+
+
+class MetricsTest(ApiTestMixin, TestCase):
+    MODEL = Person
+    RELATED_MODEL = Office
+    RELATED_MANY = Tag
+    PROCESSOR = csv.CsvProcessor
+
+    def setUp(self):
+        super(MetricsTest, self).setUp()
+
+        LocalMetrics.values = []
+        LocalMetrics.flushed = 0
+        self.manager.register('metric', LocalMetrics)
+
+    def tearDown(self):
+        self.manager.unregister('metric', LocalMetrics)
+
+    @override_settings(
+        MTR_SYNC_METRICS_BACKENDS=['LocalMetrics'], MTR_SYNC_CHUNK_SIZE=4)
+    def test_export_and_import_metrics(self):
+        report = self.manager.export_data(self.settings)
+        count = self.queryset.count()
+
+        values = LocalMetrics.values
+        names = set(name for name, value, tags in values)
+
+        self.assertEqual(LocalMetrics.flushed, 1)
+        self.assertEqual(sum(
+            value for name, value, tags in values
+            if name == 'mtr.sync.export.rows'), count)
+        self.assertIn('mtr.sync.export.rows_per_second', names)
+        self.assertIn('mtr.sync.export.seconds.write_data', names)
+        self.assertIn('mtr.sync.export.seconds.prepare_data', names)
+        self.assertIn('mtr.sync.export.bytes', names)
+        self.assertEqual(values[0][2]['processor'], 'CsvProcessor')
+
+        LocalMetrics.values = []
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+        self.manager.import_data(self.settings)
+
+        names = set(name for name, value, tags in LocalMetrics.values)
+        self.assertIn('mtr.sync.import.seconds.read_file', names)
+        self.assertIn('mtr.sync.import.seconds.import_data', names)
+        self.assertIn('mtr.sync.import.success', names)
+
+        os.remove(report.buffer_file.path)
+
+    def test_file_metrics(self):
+        path = os.path.join(tempfile.mkdtemp(), 'metrics.jsonl')
+
+        with override_settings(
+                MTR_SYNC_METRICS_BACKENDS=['FileMetrics'],
+                MTR_SYNC_METRICS_FILE=path):
+            report = self.manager.export_data(self.settings)
+
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+
+        self.assertIn(
+            'mtr.sync.export.duration', [line['name'] for line in lines])
+
+        os.remove(path)
+        os.remove(report.buffer_file.path)
@@ -1,11 +1,20 @@
 from __future__ import unicode_literals
 
+import os
+import datetime
+import tempfile
+
+from decimal import Decimal
+
 from django.test import TestCase
+from django.test.utils import override_settings
 
-from mtr.sync.tests import ProcessorTestMixin
+from mtr.sync.tests import ApiTestMixin, ProcessorTestMixin
+from mtr.sync.models import Report
 from mtr.sync.api.helpers import process_attribute
 from mtr.sync.api.processor import Processor
-from mtr.sync.api.processors import xls, xlsx, csv, ods
+from mtr.sync.api.processors import xls, xlsx, csv, ods, parquet, jsonl, \
+    sqlite
 
 from ...models import Person, Office, Tag
 
@@ -100,6 +109,83 @@ class CsvProcessorTest(ProcessorTestMixin, TestCase):
 
         self._f.close()
 
+    def test_column_type_inference(self):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as f:
+            f.write('-1,2.50,2014-01-02,true,007,abc\n')
+            f.write('15,-0.5,2014-12-31,no,,a1\n')
+
+        processor = self.manager.make_processor(self.settings)
+        max_rows, max_cols = processor.open(path)
+        processor.set_dimensions(
+            0, 0, max_rows, max_cols, import_data=True)
+
+        self.assertEqual(
+            [-1, Decimal('2.50'), datetime.date(2014, 1, 2), True, 7, 'abc'],
+            processor.read(0))
+        self.assertEqual(
+            [15, Decimal('-0.5'), datetime.date(2014, 12, 31), False, '',
+                'a1'],
+            processor.read(1))
+
+        processor.save()
+        os.remove(path)
+
+    def test_sniff_dialect_and_encoding(self):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'wb') as f:
+            f.write('name;surname\ncaf\xe9;"a;b"\n'.encode('cp1252'))
+
+        processor = self.manager.make_processor(self.settings)
+        max_rows, max_cols = processor.open(path)
+        processor.set_dimensions(
+            0, 0, max_rows, max_cols, import_data=True)
+
+        self.assertEqual(processor.delimiter, ';')
+        self.assertEqual(processor.encoding, 'cp1252')
+        self.assertEqual(self.settings.delimiter, '')
+        self.assertEqual(self.settings.encoding, '')
+        self.assertEqual((max_rows, max_cols), (2, 2))
+        self.assertEqual(['caf\xe9', 'a;b'], processor.read(1))
+
+        processor.save()
+
+        # next file sniffed again
+        with open(path, 'wb') as f:
+            f.write('name\tsurname\ncaf\xe9\tb\n'.encode('utf-8'))
+
+        processor = self.manager.make_processor(self.settings)
+        max_rows, max_cols = processor.open(path)
+        processor.set_dimensions(
+            0, 0, max_rows, max_cols, import_data=True)
+
+        self.assertEqual(processor.delimiter, '\t')
+        self.assertEqual(processor.encoding, 'utf-8')
+        self.assertEqual(['caf\xe9', 'b'], processor.read(1))
+
+        processor.save()
+        os.remove(path)
+
+    def test_column_type_inference_uses_model_fields(self):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as f:
+            f.write('007,12\n')
+
+        processor = self.manager.make_processor(self.settings)
+        processor.model = self.model
+        processor.fields = [
+            self.settings.fields.create(attribute='surname'),
+            self.settings.fields.create(attribute='security_level')]
+
+        max_rows, max_cols = processor.open(path)
+        processor.set_dimensions(
+            0, 0, max_rows, max_cols, import_data=True)
+
+        self.assertEqual(['007', 12], processor.read(0))
+
+        processor.save()
+        os.remove(path)
+
 
 class OdsProcessorTest(ProcessorTestMixin, TestCase):
     MODEL = Person
@@ -126,6 +212,242 @@ class OdsProcessorTest(ProcessorTestMixin, TestCase):
             self.assertEqual('' if value is None else value, sheet_value)
 
 
+class ParquetProcessorTest(ApiTestMixin, TestCase):
+    MODEL = Person
+    RELATED_MODEL = Office
+    RELATED_MANY = Tag
+    PROCESSOR = parquet.ParquetProcessor
+
+    def test_column_types_from_model_fields(self):
+        report = self.manager.export_data(self.settings)
+        schema = parquet.pyarrow.parquet.read_schema(report.buffer_file.path)
+
+        self.assertEqual(
+            schema.field('security_level').type, parquet.pyarrow.int64())
+        self.assertEqual(
+            schema.field('name').type, parquet.pyarrow.string())
+        self.assertEqual(
+            schema.field('office|_fk_|id').type, parquet.pyarrow.int64())
+
+        os.remove(report.buffer_file.path)
+
+    def test_read_data_with_dimensions_offset(self):
+        self.settings.start_row = 3
+        self.settings.start_col = 2
+        self.settings.include_header = True
+
+        report = self.manager.export_data(self.settings)
+
+        processor = self.manager.make_processor(self.settings)
+        max_rows, max_cols = processor.open(report.buffer_file.path)
+        processor.set_dimensions(
+            0, 0, max_rows, max_cols, import_data=True)
+
+        self.assertEqual(max_rows, self.queryset.count() + 3)
+        self.assertEqual(
+            processor.read(2, [0, 1]), ['', self.fields[0].attribute])
+
+        first = self.queryset.first()
+        self.assertEqual(
+            processor.read(3, [0, 1, 2]), ['', first.id, first.name])
+
+        os.remove(report.buffer_file.path)
+
+    def test_import_data(self):
+        report = self.manager.export_data(self.settings)
+
+        before = self.queryset.count()
+        self.queryset.delete()
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+
+        self.manager.import_data(self.settings)
+
+        self.assertEqual(before, self.queryset.count())
+
+        os.remove(report.buffer_file.path)
+
+    def test_header_names(self):
+        for field in self.fields[:2]:
+            field.name = 'same'
+            field.save()
+
+        report = self.manager.export_data(self.settings)
+        names = parquet.pyarrow.parquet.read_schema(
+            report.buffer_file.path).names
+        os.remove(report.buffer_file.path)
+
+        self.assertEqual(
+            names[:2], [field.attribute for field in self.fields[:2]])
+
+        self.settings.include_header = True
+        report = self.manager.export_data(self.settings)
+        names = parquet.pyarrow.parquet.read_schema(
+            report.buffer_file.path).names
+        os.remove(report.buffer_file.path)
+
+        self.assertEqual(names[:2], ['same', 'same_2'])
+
+    @override_settings(MTR_SYNC_PARQUET_ROW_GROUP_SIZE=1)
+    def test_invalid_value_in_next_row_group(self):
+        fd, path = tempfile.mkstemp(suffix='.parquet')
+        os.close(fd)
+
+        processor = self.manager.make_processor(self.settings)
+        processor.report = Report.objects.create(
+            action=Report.EXPORT, settings=self.settings)
+        processor.model = Person
+        processor.fields = self.fields
+        processor.set_dimensions(0, 0, 2, 1)
+
+        # first field is integer primary key
+        processor.create(path)
+        processor.write(0, [1])
+        processor.write(1, ['invalid'])
+        processor.save()
+
+        table = parquet.pyarrow.parquet.read_table(path)
+
+        self.assertEqual(table.column(0).to_pylist(), [1, None])
+        self.assertEqual(processor.errors_count, 1)
+
+        os.remove(path)
+
+
+class JsonLinesProcessorTest(ApiTestMixin, TestCase):
+    MODEL = Person
+    RELATED_MODEL = Office
+    RELATED_MANY = Tag
+    PROCESSOR = jsonl.JsonLinesProcessor
+
+    def test_export_nested_related_values(self):
+        report = self.manager.export_data(self.settings)
+
+        with open(report.buffer_file.path) as f:
+            items = [jsonl.json.loads(line) for line in f]
+
+        self.assertEqual(len(items), self.queryset.count())
+
+        instance = self.queryset.get(pk=items[0]['id'])
+        self.assertEqual(items[0]['name'], instance.name)
+        self.assertEqual(
+            items[0]['office'], {
+                'id': instance.office.id,
+                'office': instance.office.office,
+                'address': instance.office.address})
+        self.assertEqual(
+            sorted(items[0]['tags'], key=lambda t: t['id']),
+            [{'id': tag.id, 'name': tag.name}
+                for tag in instance.tags.order_by('id')])
+
+        os.remove(report.buffer_file.path)
+
+    def test_import_data(self):
+        report = self.manager.export_data(self.settings)
+
+        before = self.queryset.count()
+        self.queryset.delete()
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+
+        self.manager.import_data(self.settings)
+
+        self.assertEqual(before, self.queryset.count())
+        for instance in self.queryset:
+            self.assertEqual(instance.tags.count(), len(self.tags))
+
+        os.remove(report.buffer_file.path)
+
+
+    def test_blank_lines_skipped(self):
+        report = self.manager.export_data(self.settings)
+        path = report.buffer_file.path
+
+        with open(path) as f:
+            lines = f.read().splitlines()
+        with open(path, 'w') as f:
+            f.write('\n\n'.join(lines) + '\n\n')
+
+        before = self.queryset.count()
+        self.queryset.delete()
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+
+        imported = self.manager.import_data(self.settings)
+
+        self.assertEqual(imported.errors_count, 0)
+        self.assertEqual(imported.rows_processed, len(lines))
+        self.assertEqual(before, self.queryset.count())
+
+        os.remove(path)
+
+
+class SqliteProcessorTest(ApiTestMixin, TestCase):
+    MODEL = Person
+    RELATED_MODEL = Office
+    RELATED_MANY = Tag
+    PROCESSOR = sqlite.SqliteProcessor
+
+    def test_export_table_with_indexes(self):
+        report = self.manager.export_data(self.settings)
+
+        connection = sqlite.sqlite3.connect(report.buffer_file.path)
+        columns = dict(
+            (column[1], column[2]) for column in connection.execute(
+                'PRAGMA table_info("test")'))
+        indexes = [
+            index[1] for index in connection.execute(
+                'PRAGMA index_list("test")')]
+        count = connection.execute('SELECT COUNT(*) FROM "test"').fetchone()
+        connection.close()
+
+        self.assertEqual(columns['security_level'], 'INTEGER')
+        self.assertEqual(columns['name'], 'TEXT')
+        self.assertIn('id_index', indexes)
+        self.assertEqual(count[0], self.queryset.count())
+
+        os.remove(report.buffer_file.path)
+
+    def test_import_data(self):
+        self.settings.start_row = 2
+        report = self.manager.export_data(self.settings)
+
+        before = self.queryset.count()
+        self.queryset.delete()
+
+        self.settings.action = self.settings.IMPORT
+        self.settings.buffer_file = report.buffer_file
+
+        self.manager.import_data(self.settings)
+
+        self.assertEqual(before, self.queryset.count())
+
+        os.remove(report.buffer_file.path)
+
+    def test_header_names_and_close(self):
+        for field in self.fields[:2]:
+            field.name = 'same'
+            field.save()
+
+        self.settings.include_header = True
+        report = self.manager.export_data(self.settings)
+
+        processor = self.manager.make_processor(self.settings)
+        processor.open(report.buffer_file.path)
+        names = processor._names
+        processor.close()
+
+        self.assertEqual(names[:2], ['same', 'same_2'])
+        self.assertRaises(
+            sqlite.sqlite3.ProgrammingError,
+            processor._connection.execute, 'SELECT 1')
+
+        os.remove(report.buffer_file.path)
+
+
 class ProcessorTest(TestCase):
 
     def setUp(self):
@@ -0,0 +1,81 @@
+import os
+
+from django.test import TestCase
+
+from mtr.sync.tests import ApiTestMixin
+from mtr.sync.api.processors import csv
+from mtr.sync.api.profiling import StageTimer, QueryRecorder, \
+    normalize_sql, tracemalloc
+
+from ...models import Person, Office, Tag
+
+
+class StageTimerTest(TestCase):
+
+    def test_stages_seconds_and_counts(self):
+        timer = StageTimer()
+
+        with timer.stage(1):
+            pass
+        timer.add(1, 0.5, 10)
+
+        self.assertEqual(timer.counts[1], 11)
+        self.assertGreaterEqual(timer.seconds[1], 0.5)
+
+
+class QueryRecorderTest(TestCase):
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql(
+                'SELECT "a"."id" FROM "a"\n WHERE "a"."name" = \'x\' '
+                'AND "a"."id" IN (%s, %s, %s) LIMIT 21'),
+            'SELECT "a"."id" FROM "a" WHERE "a"."name" = ? '
+            'AND "a"."id" IN (...) LIMIT ?')
+
+    def test_queries_grouped_by_normalized_sql(self):
+        with QueryRecorder() as queries:
+            for index in range(3):
+                Tag.objects.create(name='tag{}'.format(index))
+            list(Tag.objects.filter(pk__in=[1, 2]))
+            list(Tag.objects.filter(pk__in=[1, 2, 3]))
+
+            with QueryRecorder() as nested:
+                Person.objects.count()
+
+        self.assertEqual(nested.count, 1)
+        self.assertEqual(queries.count, 6)
+
+        counts = sorted(query['count'] for query in queries.top(10))
+        self.assertEqual(counts, [1, 2, 3])
+
+    def test_queries_logged_by_connection(self):
+        with self.assertNumQueries(2):
+            with QueryRecorder() as queries:
+                Person.objects.count()
+                Tag.objects.count()
+
+        self.assertEqual(queries.count, 2)
+
+
+class RunProfilerTest(ApiTestMixin, TestCase):
+    MODEL = Person
+    RELATED_MODEL = Office
+    RELATED_MANY = Tag
+    PROCESSOR = csv.CsvProcessor
+
+    def test_profiles_saved_for_report(self):
+        report = self.manager.export_data(self.settings)
+        self.assertFalse(report.profile_file)
+
+        os.remove(report.buffer_file.path)
+
+        report = self.manager.export_data(
+            self.settings, profile=['cpu', 'memory'])
+        files = [report.buffer_file, report.profile_file]
+        if tracemalloc is not None:
+            files.append(report.memory_file)
+
+        for item in files:
+            self.assertTrue(os.path.getsize(item.path) > 0)
+            os.remove(item.path)
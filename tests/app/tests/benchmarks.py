@@ -0,0 +1,67 @@
+from django.test import TestCase
+
+from mtr.sync.api import manager
+from mtr.sync.api.processors.csv import CsvProcessor
+
+from app import benchmarks
+
+
+class BenchmarksTest(TestCase):
+
+    def setUp(self):
+        if not manager.has('processor', CsvProcessor):
+            manager.register('processor', CsvProcessor)
+
+    def test_export_and_import_results(self):
+        results = benchmarks.run(
+            sizes=[20], processors=['CsvProcessor'], memory=False)
+
+        self.assertEqual(len(results), 4)
+
+        for result in results:
+            self.assertNotIn('error', result)
+            self.assertEqual(result['rows'], 20)
+            self.assertGreater(result['queries'], 0)
+            self.assertGreater(result['rows_per_second'], 0)
+
+        self.assertEqual(
+            set((result['scenario'], result['operation'])
+                for result in results),
+            set([('flat', 'export'), ('flat', 'import'),
+                 ('related', 'export'), ('related', 'import')]))
+
+    def test_compare_with_baseline(self):
+        results = [
+            benchmarks.summarize([
+                {'processor': 'CsvProcessor', 'scenario': 'flat',
+                 'rows': 10, 'operation': 'export', 'seconds': 1,
+                 'queries': 3, 'rows_per_second': value,
+                 'peak_memory': 100}
+                for value in (90, 100, 110)])]
+        key = benchmarks.result_key(results[0])
+
+        rows = benchmarks.compare({key: dict(results[0])}, results)
+        self.assertFalse(any(row[-1] for row in rows))
+
+        baseline = {key: dict(results[0], rows_per_second=150)}
+        rows = benchmarks.compare(baseline, results)
+        self.assertEqual(
+            [row[1] for row in rows if row[-1]], ['rows_per_second'])
+        self.assertIn('REGRESSION', benchmarks.format_table(rows))
+
+    def test_sizes_limited_by_format(self):
+        results = benchmarks.run(
+            sizes=[70000], processors=['XlsProcessor'], memory=False)
+        self.assertEqual(results, [])
+
+    def test_compare_errors(self):
+        error = {'processor': 'CsvProcessor', 'scenario': 'flat',
+                 'rows': 10, 'operation': 'all', 'error': 'ValueError()'}
+        export = dict(error, operation='export', rows_per_second=100)
+        del export['error']
+
+        self.assertEqual(benchmarks.compare({}, [error]), [])
+
+        baseline = {benchmarks.result_key(export): export}
+        rows = benchmarks.compare(baseline, [error])
+        self.assertEqual([row[1] for row in rows if row[-1]], ['error'])
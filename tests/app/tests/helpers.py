@@ -1,9 +1,12 @@
 import os
+import datetime
 
 from django.test import TestCase
 
 from mtr.sync.settings import PREFIX, THEME_PATH
-from mtr.sync.helpers import themed
+from mtr.sync.helpers import themed, cron_next
+from mtr.sync.models import Settings
+from mtr.sync.api import manager, Processor
 
 
 class ThemedTest(TestCase):
@@ -28,3 +31,59 @@ class ThemedTest(TestCase):
             self.assertEquals(themed(self.template_name), new_theme_path)
 
         self.assertEquals(themed(self.template_name), default_theme_path)
+
+
+class LazyChoicesTest(TestCase):
+
+    def test_choices_evaluated_on_access(self):
+        class LazyTestProcessor(Processor):
+            file_format = '.lazy'
+            file_description = 'lazy'
+
+        field = Settings._meta.get_field('processor')
+        self.assertNotIn('LazyTestProcessor', dict(field.choices))
+
+        manager.register('processor', LazyTestProcessor)
+        self.assertIn('LazyTestProcessor', dict(field.choices))
+
+        manager.unregister('processor', LazyTestProcessor)
+        self.assertNotIn('LazyTestProcessor', dict(field.choices))
+
+
+class CronTest(TestCase):
+
+    def setUp(self):
+        # friday
+        self.date = datetime.datetime(2015, 1, 2, 10, 30, 15)
+
+    def test_next_minute_and_steps(self):
+        self.assertEqual(
+            cron_next('* * * * *', self.date),
+            datetime.datetime(2015, 1, 2, 10, 31))
+        self.assertEqual(
+            cron_next('*/15 * * * *', self.date),
+            datetime.datetime(2015, 1, 2, 10, 45))
+        self.assertEqual(
+            cron_next('0 9-11 * * *', self.date),
+            datetime.datetime(2015, 1, 2, 11, 0))
+
+    def test_days_months_and_weekdays(self):
+        self.assertEqual(
+            cron_next('0 0 1 * *', self.date),
+            datetime.datetime(2015, 2, 1, 0, 0))
+        self.assertEqual(
+            cron_next('30 8 * 3 *', self.date),
+            datetime.datetime(2015, 3, 1, 8, 30))
+        self.assertEqual(
+            cron_next('0 12 * * 1', self.date),
+            datetime.datetime(2015, 1, 5, 12, 0))
+
+        # day or weekday if both restricted
+        self.assertEqual(
+            cron_next('0 12 10 * 0', self.date),
+            datetime.datetime(2015, 1, 4, 12, 0))
+
+    def test_invalid_expression(self):
+        for expression in ('* * *', '60 * * * *', '0 0 31 2 *', 'a * * * *'):
+            with self.assertRaises(ValueError):
+                cron_next(expression, self.date)
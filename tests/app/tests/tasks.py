@@ -0,0 +1,216 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from mtr.sync.api.helpers import lazy_import, _lazy_modules
+from mtr.sync.api.exceptions import SlotsBusy
+from mtr.sync.models import Settings, Report, _fields_plans
+from mtr.sync.tasks import check_periodic_export, warm_up, run_locked, \
+    export_data
+
+
+class CheckPeriodicExportTest(TestCase):
+
+    def setUp(self):
+        self.exports = []
+        self.run = Settings.run
+        Settings.run = lambda settings: self.exports.append(settings.pk)
+
+        self.settings = Settings.objects.create(
+            action=Settings.EXPORT, processor='CsvProcessor', period=60)
+
+    def tearDown(self):
+        Settings.run = self.run
+
+    def make_due(self):
+        Settings.objects.filter(pk=self.settings.pk).update(
+            next_run_at=timezone.now() - datetime.timedelta(seconds=1))
+
+    def test_due_settings_exported_and_rescheduled(self):
+        self.assertGreater(self.settings.next_run_at, timezone.now())
+
+        check_periodic_export()
+        self.assertEqual(self.exports, [])
+
+        self.make_due()
+        check_periodic_export()
+        self.assertEqual(self.exports, [self.settings.pk])
+
+        settings = Settings.objects.get(pk=self.settings.pk)
+        self.assertGreater(settings.next_run_at, timezone.now())
+
+    def test_running_settings_skipped(self):
+        Report.objects.create(
+            action=Report.EXPORT, settings=self.settings,
+            status=Report.RUNNING)
+
+        self.make_due()
+        check_periodic_export()
+
+        self.assertEqual(self.exports, [])
+
+        # skipped run not repeated by next checks
+        settings = Settings.objects.get(pk=self.settings.pk)
+        self.assertGreater(settings.next_run_at, timezone.now())
+
+
+class SettingsScheduleTest(TestCase):
+
+    def setUp(self):
+        self.settings = Settings.objects.create(
+            action=Settings.EXPORT, processor='CsvProcessor', period=60)
+
+    def test_next_run_kept_until_schedule_changed(self):
+        next_run_at = self.settings.next_run_at
+
+        self.settings.name = 'changed'
+        self.settings.save()
+        settings = Settings.objects.get(pk=self.settings.pk)
+        settings.save()
+        self.assertEqual(settings.next_run_at, next_run_at)
+
+        settings.period = 3600
+        settings.save()
+        self.assertGreater(
+            settings.next_run_at,
+            next_run_at + datetime.timedelta(seconds=3000))
+
+        settings.period = None
+        settings.save()
+        self.assertIsNone(settings.next_run_at)
+
+    @override_settings(USE_TZ=True, TIME_ZONE='America/New_York')
+    def test_cron_in_local_time(self):
+        self.settings.cron = '0 9 * * *'
+        self.settings.save()
+
+        next_run_at = timezone.localtime(self.settings.next_run_at)
+        self.assertEqual((next_run_at.hour, next_run_at.minute), (9, 0))
+
+
+class SettingsSlotsTest(TestCase):
+
+    def setUp(self):
+        self.settings = Settings.objects.create(
+            action=Settings.EXPORT, processor='CsvProcessor',
+            max_concurrency=2)
+
+    def test_acquire_slots_until_limit(self):
+        first = self.settings.acquire_slot()
+        second = self.settings.acquire_slot()
+
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertNotEqual(first, second)
+        self.assertIsNone(self.settings.acquire_slot())
+
+        cache.delete(first)
+        self.assertEqual(self.settings.acquire_slot(), first)
+
+        cache.delete(first)
+        cache.delete(second)
+
+    def test_refresh_acquired_slot(self):
+        slot = self.settings.acquire_slot()
+
+        # expired slot restored by progress of run
+        cache.delete(slot)
+        self.settings.refresh_slot()
+        self.assertTrue(cache.get(slot))
+
+        self.settings.release_slot()
+        self.assertIsNone(cache.get(slot))
+
+
+class WarmUpTest(TestCase):
+
+    def test_warm_up(self):
+        scheduled = Settings.objects.create(
+            action=Settings.EXPORT, processor='CsvProcessor', period=60)
+        manual = Settings.objects.create(
+            action=Settings.EXPORT, processor='CsvProcessor')
+        module = lazy_import('colorsys')
+        _fields_plans.clear()
+
+        try:
+            warm_up()
+        finally:
+            _lazy_modules.remove(module)
+
+        self.assertIsNotNone(module.__dict__['_module'])
+        self.assertIn(scheduled.id, _fields_plans)
+        self.assertNotIn(manual.id, _fields_plans)
+
+
+class RunLockedTest(TestCase):
+
+    class Retry(Exception):
+        pass
+
+    def setUp(self):
+        self.queued = []
+        self.apply_async = export_data.apply_async
+        export_data.apply_async = \
+            lambda *args, **kwargs: self.queued.append(kwargs)
+
+        self.settings = Settings.objects.create(
+            action=Settings.EXPORT, processor='CsvProcessor',
+            max_concurrency=1)
+        self.task = type(str('Task'), (object,), {
+            'retry': lambda task, countdown: self.Retry()})()
+        self.task.request = type(str('Request'), (object,), {
+            'is_eager': False, 'retries': 0})()
+
+    def tearDown(self):
+        export_data.apply_async = self.apply_async
+        cache.delete(self.settings.cache_key('queued'))
+        cache.delete(self.settings.cache_key('slot', 0))
+
+    def test_run_deduplicated_until_slot_acquired(self):
+        self.assertTrue(self.settings.run())
+        self.assertFalse(self.settings.run())
+        self.assertEqual(len(self.queued), 1)
+
+        busy = Settings.objects.get(pk=self.settings.pk)
+        busy.acquire_slot()
+
+        settings = Settings.objects.get(pk=self.settings.pk)
+        self.assertRaises(
+            self.Retry, run_locked, self.task, settings, lambda: None)
+        self.assertFalse(self.settings.run())
+
+        busy.release_slot()
+        self.assertEqual(run_locked(self.task, settings, lambda: 1), 1)
+        self.assertIsNone(cache.get(settings.cache_key('slot', 0)))
+
+        self.assertTrue(self.settings.run())
+        self.assertEqual(len(self.queued), 2)
+
+    @override_settings(MTR_SYNC_LOCK_MAX_RETRIES=2)
+    def test_run_dropped_when_retries_exceeded(self):
+        self.settings.acquire_slot()
+        settings = Settings.objects.get(pk=self.settings.pk)
+        self.assertTrue(settings.run())
+
+        self.task.request.retries = 2
+        self.assertRaises(
+            SlotsBusy, run_locked, self.task, settings, lambda: None)
+        self.assertIsNone(cache.get(settings.cache_key('queued')))
+
+        # eager task not retried
+        self.task.request.retries = 0
+        self.task.request.is_eager = True
+        self.assertRaises(
+            SlotsBusy, run_locked, self.task, settings, lambda: None)
+
+    def test_queued_mark_released_if_not_sent(self):
+        def fail(*args, **kwargs):
+            raise ValueError('broker is not available')
+
+        export_data.apply_async = fail
+
+        self.assertRaises(ValueError, self.settings.run)
+        self.assertIsNone(cache.get(self.settings.cache_key('queued')))